@@ -13,10 +13,21 @@ setuptools.setup(
     url="https://github.com/swiss-art-research-net/bso-date-parser.git",
     packages=setuptools.find_packages(where="src"),
     package_dir={"": "src"},
+    package_data={"sariDateParser": ["languages/*.json"]},
+    extras_require={
+        "numpy": ["numpy"],
+        "pandas": ["numpy", "pandas>=1.5"],
+    },
+    entry_points={
+        "console_scripts": [
+            "sari-date-parse=sariDateParser.cli:main",
+            "sari-date-shapes=sariDateParser.shapes:main",
+        ],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],
-    python_requires='>=3.6'
+    python_requires='>=3.7'
 )
\ No newline at end of file
@@ -0,0 +1,180 @@
+"""
+Bulk parsing of the date strings in a large file, with one date string per line or in one column of a CSV or TSV file
+
+The file is memory-mapped and split into chunks of whole lines by byte offsets. Each chunk is decoded straight from
+a memoryview of the mapping, without copying it into bytes first, and only the date column is kept of its lines, so
+that no record objects are created. Worker processes are only sent the byte offsets of their chunk and map the same
+file, sharing its pages in the page cache instead of receiving copies of the lines.
+
+Lines are split at newlines, so quoted fields that span several lines are not supported.
+
+>>> import os, tempfile
+>>> path = os.path.join(tempfile.mkdtemp(), 'export.csv')
+>>> with open(path, 'w', encoding='utf-8') as f:
+...     _ = f.write('id,date,title\\n1,um 1900,Brief\\n2,"19. Jh.","Karte, koloriert"\\n3,,\\n')
+>>> readValues(path, 'date')
+['um 1900', '19. Jh.', '']
+>>> [edtf for chunk in parseFile(path, 'date') for edtf in chunk]
+['1900?', '18XX', None]
+"""
+import csv
+import mmap
+import os
+from collections import deque
+
+try:
+    from sariDateParser.dateParser import enableCache, parseMany, warmup
+except ImportError:
+    from dateParser import enableCache, parseMany, warmup
+
+# Approximate size in bytes of the chunks of lines that are parsed at once
+CHUNKBYTES = 4 * 1024 * 1024
+
+# Number of chunks handed to each worker process before waiting for the oldest result
+CHUNKSPERWORKER = 2
+
+BOM = b'\xef\xbb\xbf'
+
+def openMapping(path):
+    """
+    Returns a read-only mapping of a file, or None if the file is empty, since empty files cannot be mapped
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def field(line, column, separator):
+    """
+    Returns the field of a column in a line, reading lines with quotes with csv
+
+    >>> field('2,"Karte, koloriert",19. Jh.', 2, ',')
+    '19. Jh.'
+    """
+    if '"' in line:
+        try:
+            fields = next(csv.reader([line], delimiter=separator, strict=True))
+        except csv.Error as e:
+            raise ValueError("Cannot read line %r: %s. Quoted fields that span several lines are not supported." % (line, e))
+    else:
+        fields = line.split(separator, column + 1)
+    return fields[column] if column < len(fields) else ''
+
+def header(mapping, column, delimiter):
+    """
+    Returns the offset of the first line after the header, if any, and the index of the date column
+
+    >>> header(b'\\xef\\xbb\\xbfid;date\\n1;1900\\n', 'date', b';')
+    (11, 1)
+    >>> header(b'1900\\n', None, b',')
+    (0, None)
+    """
+    start = len(BOM) if mapping[:len(BOM)] == BOM else 0
+    if column is None or isinstance(column, int):
+        return start, column
+    newline = mapping.find(b'\n', start)
+    following = len(mapping) if newline == -1 else newline + 1
+    names = next(csv.reader([mapping[start:following].decode('utf-8').rstrip('\r\n')], delimiter=delimiter.decode()))
+    if column not in names:
+        raise ValueError("Column %s not found in header %s" % (column, names))
+    return following, names.index(column)
+
+def byteRanges(mapping, start, chunkBytes=CHUNKBYTES):
+    """
+    Splits the lines after start into chunks of about chunkBytes bytes, returned as pairs of byte offsets
+
+    >>> byteRanges(b'1900\\n1901\\n1902\\n', 0, chunkBytes=6)
+    [(0, 10), (10, 15)]
+    """
+    ranges = []
+    size = len(mapping)
+    while start < size:
+        end = mapping.find(b'\n', start + chunkBytes - 1)
+        end = size if end == -1 else end + 1
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+def values(mapping, start, end, column=None, delimiter=b','):
+    """
+    Returns the date strings of the lines between two byte offsets, either whole lines or the field of a column
+
+    >>> values(b'1,1900\\r\\n2,"um 1901"\\r\\n', 0, 21, 1)
+    ['1900', 'um 1901']
+    """
+    with memoryview(mapping) as view:
+        text = str(view[start:end], 'utf-8')
+    lines = text.split('\n')
+    if lines[-1] == '':
+        lines.pop()
+    if '\r' in text:
+        lines = [line[:-1] if line.endswith('\r') else line for line in lines]
+    if column is None:
+        return lines
+    separator = delimiter.decode()
+    if '"' in text:
+        return [field(line, column, separator) for line in lines]
+    return [fields[column] if column < len(fields) else '' for fields in (line.split(separator, column + 1) for line in lines)]
+
+def readValues(path, column=None, delimiter=','):
+    """
+    Returns the date strings of a file, either its lines or the fields of a column given by name or index
+    """
+    mapping = openMapping(path)
+    if mapping is None:
+        return []
+    try:
+        delimiter = delimiter.encode()
+        start, index = header(mapping, column, delimiter)
+        return values(mapping, start, len(mapping), index, delimiter)
+    finally:
+        mapping.close()
+
+def parseRange(path, start, end, column, delimiter, languages):
+    """
+    Maps a file and parses the date strings of the lines between two byte offsets
+    """
+    mapping = openMapping(path)
+    try:
+        return parseMany(values(mapping, start, end, column, delimiter), languages)
+    finally:
+        mapping.close()
+
+def initWorker(languages):
+    enableCache()
+    warmup(languages)
+
+def parseFile(path, column=None, delimiter=',', workers=1, chunkBytes=CHUNKBYTES, languages=None):
+    """
+    Parses the date strings of a file, either its lines or the fields of a column given by name or index, and yields
+    the EDTF dates of each chunk of lines as a list, in file order. With more than one worker, chunks are parsed in a
+    pool of processes, and only a bounded number of chunks is parsed ahead.
+    """
+    mapping = openMapping(path)
+    if mapping is None:
+        return
+    delimiter = delimiter.encode()
+    try:
+        start, index = header(mapping, column, delimiter)
+        ranges = byteRanges(mapping, start, chunkBytes)
+        if workers <= 1:
+            for start, end in ranges:
+                yield parseMany(values(mapping, start, end, index, delimiter), languages)
+            return
+    finally:
+        mapping.close()
+
+    from multiprocessing import Pool
+
+    with Pool(workers, initializer=initWorker, initargs=(languages,)) as pool:
+        pending = deque()
+        for start, end in ranges:
+            pending.append(pool.apply_async(parseRange, (path, start, end, index, delimiter, languages)))
+            if len(pending) >= workers * CHUNKSPERWORKER:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
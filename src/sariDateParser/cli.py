@@ -0,0 +1,292 @@
+import argparse
+import csv
+import json
+import sys
+from collections import deque
+from itertools import islice
+
+try:
+    from sariDateParser.dateParser import defaultParser, enableCache, parseMany, parseManySafe, parseStream, prewarm, warmup
+    from sariDateParser.lib.Failures import FailureCounts
+    from sariDateParser.lib.constants import DEFAULTLANGUAGES
+except ImportError:
+    from dateParser import defaultParser, enableCache, parseMany, parseManySafe, parseStream, prewarm, warmup
+    from lib.Failures import FailureCounts
+    from lib.constants import DEFAULTLANGUAGES
+
+FORMATS = ['csv', 'tsv', 'jsonl']
+DELIMITERS = {'csv': ',', 'tsv': '\t'}
+
+# Number of chunks handed to each worker process before waiting for the oldest result
+CHUNKSPERWORKER = 2
+
+def guessFormat(path):
+    """
+    Guesses the format of a file from its extension, defaulting to csv
+
+    >>> guessFormat("export.TSV")
+    'tsv'
+
+    >>> guessFormat("-")
+    'csv'
+    """
+    extension = path.rsplit('.', 1)[-1].lower()
+    return extension if extension in FORMATS else 'csv'
+
+def chunked(iterable, size):
+    """
+    Yields lists of at most size consecutive items
+
+    >>> list(chunked(range(5), 2))
+    [[0, 1], [2, 3], [4]]
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def dateValue(record, column):
+    """
+    Returns the date string in column of a record: an empty string for a missing value, and other values, such as
+    years given as numbers in JSONL files, as strings
+
+    >>> [dateValue(record, 'date') for record in [{'date': 1900}, {'date': 0}, {'date': None}, {}, {'date': 'um 1900'}]]
+    ['1900', '0', '', '', 'um 1900']
+    """
+    value = record.get(column)
+    if value is None:
+        return ''
+    return value if isinstance(value, str) else str(value)
+
+def initWorker(languages, prewarmFile=None):
+    """
+    Enables the result cache and compiles the patterns in a process, filling the caches from a prewarm file if given.
+    Returns the languages of the parser, those of the prewarm file if languages is None.
+    """
+    enableCache()
+    if prewarmFile:
+        languages = prewarm(prewarmFile, languages)
+    warmup(languages)
+    return languages
+
+def parseRecords(records, column, workers=1, chunkSize=1000, languages=None, store=None, report=None, prewarmFile=None):
+    """
+    Parses the value in column of each record and yields the records with their EDTF date, in input order.
+    Only terms of the given languages are recognised, or those of the default languages if None.
+    With more than one worker, chunks of values are parsed in a pool of processes, whose caches are filled from
+    prewarmFile if given. Only a bounded number of chunks is read ahead, so that arbitrarily large inputs can be
+    streamed. With a ResultStore, chunks are
+    parsed in this process and only values that are not stored with the current version of their rule are parsed.
+
+    >>> records = [{'id': '1', 'date': 'um 1900'}, {'id': '2', 'date': ''}, {'id': '3', 'date': '19. Jh.'}]
+    >>> [(record['id'], edtf) for record, edtf in parseRecords(records, 'date', chunkSize=2)]
+    [('1', '1900?'), ('2', None), ('3', '18XX')]
+
+    With a report function, values are parsed with parseManySafe, so that no value can stop the run, and the
+    function is called with each record and the Failure of its value, or None if it was parsed.
+
+    >>> failures = []
+    >>> parsedRecords = list(parseRecords(records, 'date', report=lambda record, failure: failures.append(failure and failure.reason)))
+    >>> failures
+    [None, 'no rule matched', None]
+    """
+    if report is not None:
+        if store is not None:
+            raise ValueError("Failures cannot be reported for values parsed with a store")
+        yield from parseRecordsSafe(records, column, workers, chunkSize, languages, report, prewarmFile)
+        return
+
+    if store is not None:
+        for chunk in chunked(records, chunkSize):
+            yield from zip(chunk, store.parseMany([dateValue(record, column) for record in chunk]))
+        return
+
+    if workers <= 1:
+        for chunk in parseStream(records, key=lambda record: dateValue(record, column), chunkSize=chunkSize, languages=languages):
+            yield from chunk
+        return
+
+    from multiprocessing import Pool
+
+    chunks = chunked(records, chunkSize)
+    with Pool(workers, initializer=initWorker, initargs=(languages, prewarmFile)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((chunk, pool.apply_async(parseMany, ([dateValue(record, column) for record in chunk], languages))))
+            if len(pending) >= workers * CHUNKSPERWORKER:
+                chunk, results = pending.popleft()
+                yield from zip(chunk, results.get())
+        while pending:
+            chunk, results = pending.popleft()
+            yield from zip(chunk, results.get())
+
+def parseRecordsSafe(records, column, workers, chunkSize, languages, report, prewarmFile=None):
+    """
+    Parses records like parseRecords with parseManySafe, and reports the Failure of each record
+    """
+    def batches():
+        if workers <= 1:
+            for chunk in chunked(records, chunkSize):
+                yield chunk, parseManySafe([dateValue(record, column) for record in chunk], languages)
+            return
+
+        from multiprocessing import Pool
+
+        with Pool(workers, initializer=initWorker, initargs=(languages, prewarmFile)) as pool:
+            pending = deque()
+            for chunk in chunked(records, chunkSize):
+                pending.append((chunk, pool.apply_async(parseManySafe, ([dateValue(record, column) for record in chunk], languages))))
+                if len(pending) >= workers * CHUNKSPERWORKER:
+                    chunk, batch = pending.popleft()
+                    yield chunk, batch.get()
+            while pending:
+                chunk, batch = pending.popleft()
+                yield chunk, batch.get()
+
+    for chunk, batch in batches():
+        for record, failure in zip(chunk, batch.failures):
+            report(record, failure)
+        yield from zip(chunk, batch.results)
+
+def readRecords(inputFile, fileFormat):
+    """
+    Returns the field names (None for jsonl) and an iterator over the records of an input file
+
+    >>> import io
+    >>> fieldnames, records = readRecords(io.StringIO('id\\tdate\\n1\\tum 1900\\n'), 'tsv')
+    >>> fieldnames, list(records)
+    (['id', 'date'], [{'id': '1', 'date': 'um 1900'}])
+
+    A CSV or TSV file without a header row raises a ValueError.
+
+    >>> readRecords(io.StringIO(''), 'csv')
+    Traceback (most recent call last):
+    ...
+    ValueError: The input has no header row
+    """
+    if fileFormat == 'jsonl':
+        return None, readJsonLines(inputFile)
+    reader = csv.DictReader(inputFile, delimiter=DELIMITERS[fileFormat])
+    if reader.fieldnames is None:
+        raise ValueError("The input has no header row")
+    return reader.fieldnames, reader
+
+def readJsonLines(inputFile):
+    """
+    Yields the records of a JSONL file, skipping empty lines, and raises a ValueError with the line number of a line
+    that is not a JSON object
+
+    >>> import io
+    >>> list(readJsonLines(io.StringIO('{"date": 1900}\\n\\n[1, 2]\\n')))
+    Traceback (most recent call last):
+    ...
+    ValueError: Line 3 is not a JSON object
+    """
+    for number, line in enumerate(inputFile, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise ValueError("Line %d is not valid JSON" % number) from None
+        if not isinstance(record, dict):
+            raise ValueError("Line %d is not a JSON object" % number)
+        yield record
+
+def writeRecords(outputFile, fileFormat, fieldnames, parsedRecords, outputColumn):
+    """
+    Writes records with their EDTF date added in outputColumn
+
+    >>> import sys
+    >>> writeRecords(sys.stdout, 'jsonl', None, [({'date': 'um 1900'}, '1900?')], 'edtf')
+    {"date": "um 1900", "edtf": "1900?"}
+    """
+    if fileFormat == 'jsonl':
+        for record, edtf in parsedRecords:
+            record[outputColumn] = edtf
+            outputFile.write(json.dumps(record, ensure_ascii=False) + '\n')
+        return
+    writer = csv.DictWriter(outputFile, fieldnames=list(fieldnames) + [outputColumn], delimiter=DELIMITERS[fileFormat], lineterminator='\n')
+    writer.writeheader()
+    for record, edtf in parsedRecords:
+        record[outputColumn] = edtf if edtf is not None else ''
+        writer.writerow(record)
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='sari-date-parse', description='Parse the dates in a column of a CSV, TSV or JSONL file into EDTF')
+    parser.add_argument('input', help='Input file, or - for standard input')
+    parser.add_argument('-o', '--output', default='-', help='Output file, or - for standard output (default)')
+    parser.add_argument('-c', '--column', required=True, help='Name of the column or key that contains the dates')
+    parser.add_argument('--output-column', default='edtf', help='Name of the column or key to write the EDTF dates to (default: edtf)')
+    parser.add_argument('-f', '--format', choices=FORMATS, help='Format of the input and output (default: guessed from the input file extension)')
+    parser.add_argument('-w', '--workers', type=int, default=1, help='Number of worker processes (default: 1)')
+    parser.add_argument('-l', '--languages', help='Comma-separated codes of the languages of the dates, in order of preference (default: %s)' % ','.join(DEFAULTLANGUAGES))
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Number of records handed to a worker at once (default: 1000)')
+    parser.add_argument('--prewarm', help='Prewarm file written by sari-date-shapes, whose shapes are loaded into the caches before parsing')
+    parser.add_argument('--store', help='SQLite file in which results are kept, so that later runs only parse values whose rule changed')
+    parser.add_argument('--diffs', help='JSONL file to write values whose result changed since they were stored to (requires --store)')
+    parser.add_argument('--failures', help='JSONL file to write the values that are not parsed to, with the reason, the rule and the detail of each')
+    options = parser.parse_args(args)
+
+    fileFormat = options.format or guessFormat(options.input)
+    inputFile = sys.stdin if options.input == '-' else open(options.input, 'r', newline='', encoding='utf-8')
+    outputFile = sys.stdout if options.output == '-' else open(options.output, 'w', newline='', encoding='utf-8')
+    try:
+        try:
+            fieldnames, records = readRecords(inputFile, fileFormat)
+        except ValueError as e:
+            parser.error("%s: %s" % (options.input, e))
+        if fieldnames is not None and options.column not in fieldnames:
+            parser.error("Column %s not found in %s" % (options.column, options.input))
+        languages = options.languages.split(',') if options.languages else None
+        try:
+            languages = initWorker(languages, options.prewarm)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+        store = None
+        if options.store:
+            if options.failures:
+                parser.error("--failures cannot be combined with --store")
+            try:
+                from sariDateParser.store import ResultStore
+            except ImportError:
+                from store import ResultStore
+            store = ResultStore(options.store, defaultParser(languages))
+        elif options.diffs:
+            parser.error("--diffs requires --store")
+        counts = failuresFile = reportFailure = None
+        if options.failures:
+            counts = FailureCounts()
+            failuresFile = open(options.failures, 'w', encoding='utf-8')
+
+            def reportFailure(record, failure):
+                counts.add(failure)
+                if failure is not None:
+                    failuresFile.write(json.dumps({'value': record.get(options.column), 'reason': failure.reason, 'rule': failure.rule, 'detail': failure.detail}, ensure_ascii=False) + '\n')
+
+        parsedRecords = parseRecords(records, options.column, workers=options.workers, chunkSize=options.chunk_size, languages=languages, store=store, report=reportFailure, prewarmFile=options.prewarm)
+        try:
+            writeRecords(outputFile, fileFormat, fieldnames, parsedRecords, options.output_column)
+        except ValueError as e:
+            parser.error("%s: %s" % (options.input, e))
+        if failuresFile is not None:
+            failuresFile.close()
+            sys.stderr.write("%s\n" % counts)
+        if store is not None:
+            report = store.report()
+            store.close()
+            sys.stderr.write("%d values added, %d reused and %d parsed again, of which %d changed\n" % (report.added, report.reused, report.reparsed, len(report.diffs)))
+            if options.diffs:
+                with open(options.diffs, 'w', encoding='utf-8') as diffsFile:
+                    for diff in report.diffs:
+                        diffsFile.write(json.dumps(diff._asdict(), ensure_ascii=False) + '\n')
+    finally:
+        if inputFile is not sys.stdin:
+            inputFile.close()
+        if outputFile is not sys.stdout:
+            outputFile.close()
+
+if __name__ == '__main__':
+    main()
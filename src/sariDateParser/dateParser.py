@@ -1,13 +1,555 @@
-import re
+import sys
+from itertools import islice
+from threading import Lock
+from time import perf_counter
 
 try:
-    import sariDateParser.lib.constants as constants
+    import sariDateParser.lib.Calendar as Calendar
+    import sariDateParser.lib.CompiledPatterns as CompiledPatterns
     import sariDateParser.lib.DateStringParsers as DateStringParsers
-    import sariDateParser.lib.TestPatterns as TestPatterns
+    import sariDateParser.lib.Tokenizer as Tokenizer
+    import sariDateParser.lib.constants as constants
+    import sariDateParser.lib.Explanation as Explanation
+    import sariDateParser.lib.Failures as Failures
+    from sariDateParser.lib.Instrumentation import Instrumentation
+    from sariDateParser.lib.LRUCache import LRUCache, MISSING
 except ImportError:
-    import lib.constants as constants
+    import lib.Calendar as Calendar
+    import lib.CompiledPatterns as CompiledPatterns
     import lib.DateStringParsers as DateStringParsers
-    import lib.TestPatterns as TestPatterns
+    import lib.Tokenizer as Tokenizer
+    import lib.constants as constants
+    import lib.Explanation as Explanation
+    import lib.Failures as Failures
+    from lib.Instrumentation import Instrumentation
+    from lib.LRUCache import LRUCache, MISSING
+
+# Parsers that interpret date strings whose pattern matches the test pattern of the same name
+PARSERS = {test: getattr(DateStringParsers, test, None) for test in CompiledPatterns.TESTORDER}
+
+# Default number of entries kept by the caches
+CACHESIZE = 4096
+
+# Rule counts and stage timings, only collected once enabled with enableInstrumentation
+instrumentation = None
+
+class DateParser:
+    """
+    Parser of date strings with a configuration that is compiled once when it is created: the languages whose terms
+    are recognised, in order of preference, the century of years given with two digits or a pivot year from which
+    they count the next hundred years, the rules that are tested and their order, the number of results that are
+    cached and the length of the longest date string that is parsed, which bounds the time of each call (None for no
+    limit). A parser cannot be changed once it is created, so that it can be shared between threads.
+
+    >>> parser = DateParser(languages=['fr'], defaultCentury='18')
+    >>> parser.parse("2 Juin 90")
+    '1890-06-02'
+
+    >>> DateParser(defaultCentury='1930').parseMany(["Febr. 36.", "Febr. 12."])
+    ['1936-02', '2012-02']
+
+    >>> DateParser(enabledRules=['century', 'singleYearWithQualifier']).parseMany(["19. Jh.", "um 1900", "10.5.1985"])
+    ['18XX', '1900?', None]
+
+    >>> DateParser(maxLength=10).parseMany(["um 1900", "um 1900" + " " * 10])
+    ['1900?', None]
+
+    >>> parser.defaultCentury = '17'
+    Traceback (most recent call last):
+    ...
+    AttributeError: DateParser cannot be changed once it is created
+    """
+    __slots__ = ('languages', 'defaultCentury', 'rules', 'cacheSize', 'maxLength', '_maxLength', '_patterns', '_dispatch', '_ruleCache', '_resultCache')
+
+    def __init__(self, languages=None, defaultCentury=constants.DEFAULTCENTURY, ruleOrder=None, enabledRules=None, cacheSize=0, maxLength=constants.MAXLENGTH):
+        patterns = CompiledPatterns.forLanguages(languages)
+        rules = list(CompiledPatterns.TESTORDER if ruleOrder is None else ruleOrder)
+        unknown = [rule for rule in rules + list(enabledRules or []) if rule not in PARSERS]
+        if unknown:
+            raise ValueError("Unknown rules: %s" % ', '.join(unknown))
+        if enabledRules is not None:
+            rules = [rule for rule in rules if rule in enabledRules]
+        initialise = object.__setattr__
+        initialise(self, 'languages', patterns.languages)
+        defaultCentury = str(defaultCentury)
+        Calendar.fullYears(defaultCentury)
+        initialise(self, 'defaultCentury', defaultCentury)
+        initialise(self, 'rules', tuple(rules))
+        initialise(self, 'cacheSize', cacheSize)
+        initialise(self, 'maxLength', maxLength)
+        initialise(self, '_maxLength', sys.maxsize if maxLength is None else maxLength)
+        initialise(self, '_patterns', patterns)
+        initialise(self, '_dispatch', patterns.DISPATCH if rules == CompiledPatterns.TESTORDER else CompiledPatterns.dispatchTable(patterns.TESTS, rules))
+        initialise(self, '_ruleCache', LRUCache(CACHESIZE))
+        initialise(self, '_resultCache', LRUCache(cacheSize) if cacheSize else None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("DateParser cannot be changed once it is created")
+
+    def __delattr__(self, name):
+        raise AttributeError("DateParser cannot be changed once it is created")
+
+    def __repr__(self):
+        return "DateParser(languages=%r, defaultCentury=%r, ruleOrder=%r, cacheSize=%r, maxLength=%r)" % (list(self.languages), self.defaultCentury, list(self.rules), self.cacheSize, self.maxLength)
+
+    def cacheInfo(self):
+        """
+        Returns the hit and miss statistics of the result cache (None if disabled) and of the rule cache
+        """
+        return {
+            'results': self._resultCache.info() if self._resultCache is not None else None,
+            'rules': self._ruleCache.info()
+        }
+
+    def clearCache(self):
+        """
+        Empties the result and rule caches and resets their statistics
+        """
+        if self._resultCache is not None:
+            self._resultCache.clear()
+        self._ruleCache.clear()
+
+    def extractPattern(self, dateString):
+        return Tokenizer.toPattern(Tokenizer.tokenize(dateString, self._patterns))
+
+    def matchRule(self, pattern):
+        rule = self._ruleCache.get(pattern)
+        if rule is MISSING:
+            rule = None
+            for test, search in self._dispatch[CompiledPatterns.features(pattern)]:
+                if search(pattern):
+                    rule = (test, PARSERS[test])
+                    break
+            self._ruleCache.put(pattern, rule)
+        return rule
+
+    def interpret(self, dateString, pattern, tokens=None, structured=False):
+        if len(dateString) > self._maxLength:
+            return None
+        if instrumentation is not None:
+            return self.interpretInstrumented(dateString, pattern, tokens, structured)
+        rule = self.matchRule(pattern)
+        if rule is None:
+            return None
+        test, f = rule
+        if not f:
+            raise NotImplementedError("Function %s not implemented" % test)
+        result = f(cleanDateString(dateString), tokens, structured, self._patterns, self.defaultCentury)
+        if structured and result is not None:
+            result.rule = test
+        return result
+
+    def interpretInstrumented(self, dateString, pattern=None, tokens=None, structured=False):
+        """
+        Interprets a date string like interpret, extracting its pattern if not given, and reports the matched rule and
+        the timings of each stage to the enabled instrumentation
+        """
+        timings = {}
+        start = perf_counter()
+        if pattern is None:
+            tokens = Tokenizer.tokenize(dateString, self._patterns)
+            pattern = Tokenizer.toPattern(tokens)
+            extracted = perf_counter()
+            timings['extractPattern'] = extracted - start
+        else:
+            extracted = start
+        rule = self.matchRule(pattern)
+        dispatched = perf_counter()
+        timings['dispatch'] = dispatched - extracted
+        result = None
+        if rule is not None:
+            test, f = rule
+            if not f:
+                raise NotImplementedError("Function %s not implemented" % test)
+            result = f(cleanDateString(dateString), tokens, structured, self._patterns, self.defaultCentury)
+            if structured and result is not None:
+                result.rule = test
+            timings['parser'] = perf_counter() - dispatched
+        instrumentation.observe(dateString, pattern, rule[0] if rule else None, result, timings)
+        return result
+
+    def parse(self, dateString):
+        # Longer strings are not dates, and would only take longer to search
+        if len(dateString) > self._maxLength:
+            return None
+        resultCache = self._resultCache
+        if resultCache is not None:
+            result = resultCache.get(dateString)
+            if result is not MISSING:
+                if instrumentation is not None:
+                    instrumentation.observeCacheHit()
+                return result
+
+        if instrumentation is not None:
+            result = self.interpretInstrumented(dateString)
+        else:
+            tokens = Tokenizer.tokenize(dateString, self._patterns)
+            result = self.interpret(dateString, Tokenizer.toPattern(tokens), tokens)
+
+        if resultCache is not None:
+            resultCache.put(dateString, result)
+        return result
+
+    def parseStructured(self, dateString):
+        if len(dateString) > self._maxLength:
+            return None
+        if instrumentation is not None:
+            return self.interpretInstrumented(dateString, structured=True)
+        tokens = Tokenizer.tokenize(dateString, self._patterns)
+        return self.interpret(dateString, Tokenizer.toPattern(tokens), tokens, structured=True)
+
+    def prewarm(self, shapes):
+        """
+        Fills the rule cache with the rules of the patterns of the given shapes, and the result cache, if enabled, with
+        the results of their examples, as read from a prewarm file written by the shapes report
+
+        >>> parser = DateParser(cacheSize=10)
+        >>> parser.prewarm([{'pattern': 'um ____', 'example': 'um 1900'}, {'pattern': '__. ¢'}])
+        >>> parser.cacheInfo()['rules'].currsize, parser.cacheInfo()['results'].currsize
+        (2, 1)
+        """
+        for shape in shapes:
+            self.matchRule(shape['pattern'])
+            if shape.get('example') is not None:
+                self.parse(shape['example'])
+
+    def explain(self, dateString):
+        """
+        Returns an Explanation of how a date string is interpreted: its pattern and tokens, the outcome of the test of
+        every rule with the groups it captured from the pattern, the rule and parser function that interpreted it, the
+        result and the duration of each stage. Rules after the matching one are tested as well, to show which of them
+        it shadows, but are not reached when parsing.
+
+        >>> explanation = DateParser().explain("1850")
+        >>> explanation.pattern, explanation.rule, explanation.result
+        ('____', 'singleYearWithQualifier', '1850')
+        >>> [(trial.rule, trial.outcome, trial.groups) for trial in explanation.trials if trial.outcome != 'skipped']
+        [('singleYearWithQualifier', 'matched', ('____',)), ('beforeYearWithQualifier', 'not reached', None), ('afterYearWithQualifier', 'not reached', None), ('yearRangeWithQualifier', 'not reached', None), ('singleYearRelaxed', 'shadowed', ())]
+
+        Date strings longer than maxLength are not tokenized, and have no pattern.
+        """
+        if len(dateString) > self._maxLength:
+            return Explanation.Explanation(dateString, None, [], [], None, None, None, {})
+        start = perf_counter()
+        tokens = Tokenizer.tokenize(dateString, self._patterns)
+        pattern = Tokenizer.toPattern(tokens)
+        extracted = perf_counter()
+        candidates = {test for test, search in self._dispatch[CompiledPatterns.features(pattern)]}
+        trials = []
+        rule = None
+        dispatch = 0.0
+        for test in self.rules:
+            if test not in candidates:
+                trials.append(Explanation.Trial(test, Explanation.SKIPPED, None, 0.0))
+                continue
+            before = perf_counter()
+            match = self._patterns.TESTS[test].search(pattern)
+            seconds = perf_counter() - before
+            if rule is not None:
+                outcome = Explanation.UNREACHED if match is None else Explanation.SHADOWED
+            else:
+                dispatch += seconds
+                outcome = Explanation.NOMATCH if match is None else Explanation.MATCHED
+                if match is not None:
+                    rule = test
+            trials.append(Explanation.Trial(test, outcome, match.groups() if match else None, seconds))
+
+        timings = {'extractPattern': extracted - start, 'dispatch': dispatch}
+        parser = result = None
+        if rule is not None:
+            f = PARSERS[rule]
+            if not f:
+                raise NotImplementedError("Function %s not implemented" % rule)
+            parser = 'DateStringParsers.' + f.__name__
+            before = perf_counter()
+            result = f(cleanDateString(dateString), tokens, False, self._patterns, self.defaultCentury)
+            timings['parser'] = perf_counter() - before
+        return Explanation.Explanation(dateString, pattern, tokens, trials, rule, parser, result, timings)
+
+    def explainMany(self, dateStrings):
+        """
+        Explains every date string of a corpus and returns the aggregated counts and timings of each rule and stage,
+        the rules that never matched and the most common patterns that no rule matched, as in ExplanationSummary.info
+
+        >>> info = DateParser().explainMany(["um 1900", "19. Jh.", "o.J.", "um 1850"])
+        >>> info['rules']['singleYearWithQualifier']['matched'], info['unmatchedPatterns']
+        (2, [('o.J.', 1)])
+        >>> 'midCentury' in info['neverMatched']
+        True
+        """
+        summary = Explanation.ExplanationSummary(self.rules)
+        for dateString in dateStrings:
+            summary.add(self.explain(dateString))
+        return summary.info()
+
+    def parseWithRule(self, dateString):
+        """
+        Returns the EDTF date of a date string and the name of the rule that interpreted it, or None for both
+
+        >>> DateParser().parseWithRule("um 1900")
+        ('1900?', 'singleYearWithQualifier')
+        """
+        if len(dateString) > self._maxLength:
+            return None, None
+        tokens = Tokenizer.tokenize(dateString, self._patterns)
+        rule = self.matchRule(Tokenizer.toPattern(tokens))
+        if rule is None:
+            return None, None
+        test, f = rule
+        if not f:
+            raise NotImplementedError("Function %s not implemented" % test)
+        return f(cleanDateString(dateString), tokens, False, self._patterns, self.defaultCentury), test
+
+    def findDates(self, text):
+        """
+        Finds the dates in a text, such as a description or a provenance note, and returns them in text order as
+        DateMatch tuples with their offsets in the text, their text, EDTF date and rule. See DateFinder.
+
+        >>> for match in DateParser().findDates("Brief vom 2. Mai 1985 an seinen Bruder. Nachlass [um 1900], 2. Hälfte 19. Jh."):
+        ...     print(match.start, match.end, repr(match.text), match.edtf, match.rule)
+        10 21 '2. Mai 1985' 1985-05-02 fullDateWithMonthInLangOrRoman
+        50 57 'um 1900' 1900? singleYearWithQualifier
+        60 76 '2. Hälfte 19. Jh' 1850/1899 midCentury
+        """
+        try:
+            import sariDateParser.lib.DateFinder as DateFinder
+        except ImportError:
+            import lib.DateFinder as DateFinder
+        return DateFinder.findDates(text, self._patterns, self.rules, self.parseWithRule)
+
+    def ruleVersions(self):
+        """
+        Returns a version hash of each rule, which changes whenever the results of the rule could change, and of
+        date strings that no rule interprets under the key None. See RuleVersions.
+        """
+        try:
+            import sariDateParser.lib.RuleVersions as RuleVersions
+        except ImportError:
+            import lib.RuleVersions as RuleVersions
+        return RuleVersions.ruleVersions(self._patterns, self.rules, PARSERS, self.defaultCentury, self.maxLength)
+
+    def parseMany(self, dateStrings):
+        tokenize = Tokenizer.tokenize
+        toPattern = Tokenizer.toPattern
+        clean = CompiledPatterns.BRACKETS.sub
+        matchRule = self.matchRule
+        patterns = self._patterns
+        defaultCentury = self.defaultCentury
+        resultCache = self._resultCache
+        maxLength = self._maxLength
+        results = {}
+        parsed = []
+        for dateString in dateStrings:
+            if dateString in results:
+                parsed.append(results[dateString])
+                continue
+            if len(dateString) > maxLength:
+                parsed.append(None)
+                continue
+            result = resultCache.get(dateString) if resultCache is not None else MISSING
+            if result is not MISSING:
+                if instrumentation is not None:
+                    instrumentation.observeCacheHit()
+            else:
+                if instrumentation is not None:
+                    result = self.interpretInstrumented(dateString)
+                else:
+                    tokens = tokenize(dateString, patterns)
+                    rule = matchRule(toPattern(tokens))
+                    result = None
+                    if rule is not None:
+                        test, f = rule
+                        if not f:
+                            raise NotImplementedError("Function %s not implemented" % test)
+                        result = f(clean('', dateString), tokens, False, patterns, defaultCentury)
+                if resultCache is not None:
+                    resultCache.put(dateString, result)
+            results[dateString] = result
+            parsed.append(result)
+        return parsed
+
+    def parseSafe(self, dateString):
+        """
+        Parses a date string like parse, but never raises, and returns its EDTF date and None, or None and the Failure
+        that tells why it is not parsed: no rule matched its pattern, the parser of the rule that matched could not
+        extract a date, the date does not exist, the date string is too long, or the parser raised. See Failures.
+        A date whose day or month does not exist is an invalid date, which is returned with the lower precision that
+        parse gives it together with its Failure, so that the results are always those of parse.
+
+        >>> parser = DateParser()
+        >>> parser.parseSafe("um 1900")
+        ('1900?', None)
+        >>> parser.parseSafe("o.J.")
+        (None, Failure(reason='no rule matched', rule=None, detail='o.J.'))
+        >>> parser.parseSafe("31.31.1850"), parser.parse("31.31.1850")
+        (('1850', Failure(reason='invalid date', rule='singleDate', detail='1850-31-31')), '1850')
+        >>> parser.parseSafe("30 Feb 1861")
+        ('1861-02', Failure(reason='invalid date', rule='fullDateWithMonthInLangOrRoman', detail='1861-02-30'))
+        >>> parser.parseSafe("7.VIII.[18]9z8")
+        (None, Failure(reason='extract failed', rule='fullDateWithMonthInLangOrRoman', detail='_.🌕.___z_'))
+        >>> parser.parseSafe(None)
+        (None, Failure(reason='error', rule=None, detail="TypeError: object of type 'NoneType' has no len()"))
+        """
+        test = None
+        try:
+            if len(dateString) > self._maxLength:
+                return None, Failures.Failure(Failures.TOOLONG, None, "%d characters" % len(dateString))
+            tokens = Tokenizer.tokenize(dateString, self._patterns)
+            pattern = Tokenizer.toPattern(tokens)
+            rule = self.matchRule(pattern)
+            if rule is None:
+                return None, Failures.Failure(Failures.NORULE, None, pattern)
+            test, f = rule
+            if not f:
+                return None, Failures.Failure(Failures.ERROR, test, "Function %s not implemented" % test)
+            # Structured results keep the impossible date that the parser reduced to a lower precision
+            parsed = f(cleanDateString(dateString), tokens, True, self._patterns, self.defaultCentury)
+        except Exception as e:
+            return None, Failures.Failure(Failures.ERROR, test, "%s: %s" % (type(e).__name__, e))
+        if parsed is None:
+            return None, Failures.Failure(Failures.EXTRACTFAILED, test, pattern)
+        if parsed.invalid is not None:
+            return parsed.edtf, Failures.Failure(Failures.INVALIDDATE, test, parsed.invalid)
+        if Failures.invalidDate(parsed.edtf):
+            return parsed.edtf, Failures.Failure(Failures.INVALIDDATE, test, parsed.edtf)
+        return parsed.edtf, None
+
+    def parseManySafe(self, dateStrings):
+        """
+        Parses an iterable of date strings like parseMany, but never raises, and returns a Batch with the EDTF date or
+        None and the Failure or None of each date string, in input order, and the FailureCounts of the batch.
+        Identical date strings are only parsed once. The results are those of parseMany.
+
+        >>> batch = DateParser().parseManySafe(["um 1900", "o.J.", "um 1900", "August 19v0", "13.13.1861"])
+        >>> batch.results
+        ['1900?', None, '1900?', None, '1861']
+        >>> print(batch.counts)
+        5 date strings, 2 parsed, 3 not parsed: 1 no rule matched, 1 extract failed, 1 invalid date
+        """
+        parseSafe = self.parseSafe
+        seen = {}
+        results = []
+        failures = []
+        counts = Failures.FailureCounts()
+        for dateString in dateStrings:
+            parsed = seen.get(dateString)
+            if parsed is None:
+                parsed = seen[dateString] = parseSafe(dateString)
+            result, failure = parsed
+            results.append(result)
+            failures.append(failure)
+            counts.add(failure)
+        return Failures.Batch(results, failures, counts)
+
+    def parseStream(self, records, key=None, chunkSize=None):
+        if chunkSize is None:
+            for record in records:
+                dateString = key(record) if key else record
+                yield record, self.parse(dateString)
+            return
+
+        iterator = iter(records)
+        while True:
+            chunk = list(islice(iterator, chunkSize))
+            if not chunk:
+                return
+            yield list(zip(chunk, self.parseMany([key(record) for record in chunk] if key else chunk)))
+
+# Number of results cached by the parsers of the module-level functions, 0 until enabled with enableCache
+cacheSize = 0
+# Parsers of the module-level functions for each combination of languages, None for the default languages
+parsers = {}
+parsersLock = Lock()
+
+def defaultParser(languages=None):
+    """
+    Returns the parser used by the module-level functions for a combination of languages, creating it on first use.
+    Parsers are kept for the default languages and for the last constants.MAXLANGUAGECOMBINATIONS combinations.
+
+    >>> defaultParser(['fr']) is defaultParser(('fr',))
+    True
+    """
+    key = None if languages is None else (languages,) if isinstance(languages, str) else tuple(languages)
+    parser = parsers.get(key)
+    if parser is None:
+        with parsersLock:
+            parser = parsers.get(key)
+            if parser is None:
+                parser = DateParser(languages, cacheSize=cacheSize)
+                others = [other for other in parsers if other is not None]
+                if len(others) >= constants.MAXLANGUAGECOMBINATIONS:
+                    del parsers[others[0]]
+                parsers[key] = parser
+    return parser
+
+def warmup(languages=None):
+    """
+    Builds and compiles all patterns, which is otherwise done on the first parse, including those of the given
+    languages. Call it before forking worker processes, so that they share the compiled patterns, or to keep the
+    cost out of the first request.
+
+    >>> warmup()
+    >>> 'DISPATCH' in vars(CompiledPatterns)
+    True
+    """
+    CompiledPatterns.build()
+    defaultParser(languages)
+
+def prewarm(path, languages=None):
+    """
+    Loads a prewarm file written by `sari-date-shapes --prewarm`, and fills the caches of the parser of the given
+    languages with the most frequent shapes of a corpus. Call it at startup after enableCache, so that the first
+    requests after a deploy do not all miss the caches. If languages is None, the languages the shapes were reported
+    with are used. Returns the languages of the parser whose caches were filled.
+    """
+    import json
+    with open(path, 'r', encoding='utf-8') as f:
+        prewarmed = json.load(f)
+    if languages is None:
+        languages = prewarmed.get('languages')
+    defaultParser(languages).prewarm(prewarmed['shapes'])
+    return languages
+
+def enableCache(maxsize=CACHESIZE):
+    """
+    Keeps the results of the most recently parsed date strings, so that recurring date strings are not parsed again
+
+    >>> enableCache(2)
+    >>> [parse(d) for d in ["um 1900", "um 1900", "o.J."]]
+    ['1900?', '1900?', None]
+    >>> cacheInfo()['results']
+    CacheInfo(hits=1, misses=2, maxsize=2, currsize=2)
+    >>> disableCache()
+    """
+    global cacheSize
+    with parsersLock:
+        cacheSize = maxsize
+        parsers.clear()
+
+def disableCache():
+    """
+    Stops keeping the results of parsed date strings
+    """
+    enableCache(0)
+
+def clearCache():
+    """
+    Empties the result and rule caches and resets their statistics
+    """
+    for parser in list(parsers.values()):
+        parser.clearCache()
+
+def cacheInfo():
+    """
+    Returns the hit and miss statistics of the result cache (None if disabled) and of the rule cache of the default
+    languages
+
+    >>> clearCache()
+    >>> results = [parse(d) for d in ["1751", "1848", "19. Jh."]]
+    >>> cacheInfo()['rules']
+    CacheInfo(hits=1, misses=2, maxsize=4096, currsize=2)
+    """
+    return defaultParser().cacheInfo()
 
 def cleanDateString(dateString):
     """
@@ -20,12 +562,13 @@ def cleanDateString(dateString):
     'vermutlich um 1900'
 
     """
-    s = re.sub('\[|\]', '', dateString)
+    s = CompiledPatterns.BRACKETS.sub('', dateString)
     return s
 
-def extractPattern(dateString):
+def extractPattern(dateString, languages=None):
     """
-    Normalises a date string by replacing digits and date terms with placeholders
+    Normalises a date string by replacing digits and date terms with placeholders. Date terms are those of the given
+    languages, or of the default languages if None.
 
     >>> extractPattern("10.5.1985")
     '__._.____'
@@ -36,45 +579,82 @@ def extractPattern(dateString):
     >>> extractPattern("7 9br 1950")
     '_ 🌕 ____'
 
+    >>> extractPattern("7 9br 1950", languages=['de', 'en'])
+    '_ _br ____'
     """
-    # Remove square brackets that indicate deducted dates
-    genericDate = re.sub(r'\[|\]', '', dateString)
-
-    # Order of language preference for month detections
-    langOrder = ['de', 'en', 'fr']
-    # Normalise months in different languages
-    for lang in langOrder:
-        regexPattern = r'(' + ')|('.join([month for variations in [constants.MONTHTERMS[lang][d] for d in constants.MONTHTERMS[lang]] for month in variations]) + ')'                            
-        genericDate = re.sub(regexPattern, '🌕', genericDate, flags=re.IGNORECASE)
-    genericDate = re.sub(r'🌕r|🌕re|🌕s|🌕br|🌕st|🌕obr|🌕ob|🌕t', '🌕', genericDate, flags=re.IGNORECASE)
+    return defaultParser(languages).extractPattern(dateString)
 
-    # Normalise indicators of unknown data
-    genericDate = re.sub(r'XX|xx', '❓', genericDate)
+def enableInstrumentation(callback=None):
+    """
+    Counts how often each rule interprets a date string, and how often no rule does, and times extracting the
+    pattern, dispatching it to a rule and running the parser. The callback, if given, is called for every parsed
+    date string with the date string, its pattern, the name of the rule, the result and the timings of each stage.
+    Instrumentation adds no cost to parsing until it is enabled.
+
+    >>> enableInstrumentation()
+    >>> parseMany(["um 1900", "o.J.", "um 1850"])
+    ['1900?', None, '1850?']
+    >>> info = instrumentationInfo()
+    >>> info['rules']
+    {'singleYearWithQualifier': 2, None: 1}
+    >>> info['stages']['parser']['count']
+    2
+    >>> disableInstrumentation()
+    """
+    global instrumentation
+    instrumentation = Instrumentation(callback)
 
-    # Normalise month in roman numerals
-    monthsRoman = r'(' + ')|('.join([month for variations in [constants.MONTHTERMS['roman'][d] for d in constants.MONTHTERMS['roman']] for month in variations]) + ')'                            
-    genericDate = re.sub(monthsRoman, '🌕', genericDate)
+def disableInstrumentation():
+    """
+    Stops collecting rule counts and timings
+    """
+    global instrumentation
+    instrumentation = None
 
-    # Normalise century terms
-    centuriesPattern = r'(' + ')|('.join(constants.ALLCENTURYTERMS) + ')'
-    genericDate = re.sub(centuriesPattern, '¢', genericDate)
+def instrumentationInfo():
+    """
+    Returns the rule counts, latency histograms of each stage and result cache hits collected since
+    instrumentation was enabled, or None if it is disabled
+    """
+    if instrumentation is None:
+        return None
+    return instrumentation.info()
 
-    # Normalise terms for half
-    midTermPattern = r'(' + ')|('.join(constants.ALLMIDTERMS) + ')'
-    midTermPattern = midTermPattern.replace('.','\.')
-    genericDate = re.sub(midTermPattern, '½', genericDate)
+def explain(dateString, languages=None):
+    """
+    Returns an Explanation of how a date string is interpreted, with its pattern, the outcome of every rule, the
+    parser function, the result and the timings of each stage. Print it for a report. Languages are selected as in
+    parse.
+
+    >>> print(explain("um 1900"))  # doctest: +ELLIPSIS
+    'um 1900' -> '1900?'
+    pattern   'um ____'
+    rule      singleYearWithQualifier (DateStringParsers.singleYearWithQualifier)
+    ...
+    """
+    return defaultParser(languages).explain(dateString)
 
-    # Normalise digits
-    genericDate = re.sub(r'\d','_', genericDate)
+def explainMany(dateStrings, languages=None):
+    """
+    Explains every date string of a corpus and returns the aggregated counts and timings of each rule and stage, to
+    find rules that are expensive or never match. Languages are selected as in parse.
+    """
+    return defaultParser(languages).explainMany(dateStrings)
 
-    # Strip whitespace
-    genericDate = genericDate.strip()
+def findDates(text, languages=None):
+    """
+    Finds the dates in a text, such as a description or a provenance note, and returns them in text order with their
+    offsets in the text. Languages are selected as in parse.
 
-    return genericDate
+    >>> [(match.text, match.edtf) for match in findDates("Geschenk von 1912, im Katalog auf 1850-1860 datiert")]
+    [('1912', '1912'), ('1850-1860', '1850/1860')]
+    """
+    return defaultParser(languages).findDates(text)
 
-def interpret(dateString, pattern):
+def interpret(dateString, pattern, tokens=None, languages=None):
     """
-    Converts a string containing date to an EDTF date using the provided pattern
+    Converts a string containing date to an EDTF date using the provided pattern.
+    Parsers read month numbers and digits from the tokens of the date string if they are given.
 
     >>> interpret("1840","____")
     '1840'
@@ -85,22 +665,26 @@ def interpret(dateString, pattern):
     >>> interpret("22 Aug [18]59","__ 🌕____")
     '1859-08-22'
     """
-    ds = cleanDateString(dateString)
-    testOrder = ['singleDate', 'fullDateWithMonthInLangOrRoman', 'monthAndYearWithMonthInLangOrRoman', 'singleYearWithQualifier', 'beforeYearWithQualifier', 'afterYearWithQualifier', 'yearRangeWithQualifier', 'yearWithPlaceHolderAndQualifier', 'centuryRange', 'midCentury', 'century', 'singleYearRelaxed']
+    return defaultParser(languages).interpret(dateString, pattern, tokens)
 
-    for test in testOrder:
-        m = re.search(getattr(TestPatterns, test), pattern)
-        if m:    
-            f = getattr(DateStringParsers, test)
-            if not f:
-                raise NotImplementedError("Function %s not implemented" % test)
-            return f(ds)
-    
-    return None
+def matchRule(pattern, languages=None):
+    """
+    Returns the name and parser function of the first rule whose test pattern matches the pattern, or None.
+    Only rules whose required characters occur in the pattern are tested, and rules are remembered for recently
+    seen patterns, so that date strings of the same shape skip the rule scan. Test patterns are those compiled for
+    the given languages, or for the default languages if None.
+
+    >>> matchRule("ca. __. ¢")[0]
+    'century'
+
+    >>> matchRule("o.J.")
+    """
+    return defaultParser(languages).matchRule(pattern)
 
-def parse(dateString):
+def parse(dateString, languages=None):
     """
-    Parse a date string into EDTF Format.
+    Parse a date string into EDTF Format. Only terms of the given languages are recognised, in order of preference,
+    or those of the default languages if None.
 
     >>> parse("1751")
     '1751'
@@ -137,11 +721,85 @@ def parse(dateString):
 
     >>> parse("[zweite Hälfte des 17. Jahrhunderts]")
     '1650/1699'
+
+    >>> parse("2 Juin 1890", languages=['fr']), parse("2 Juin 1890", languages=['de'])
+    ('1890-06-02', '1890')
+    """
+    return defaultParser(languages).parse(dateString)
+
+def parseStructured(dateString, languages=None):
+    """
+    Parse a date string into a ParsedDate with the EDTF string, the bounds, the precision and the qualifiers of the date,
+    and the name of the rule that interpreted it. Returns None if no rule matches.
+
+    >>> parseStructured("ca. April 1940")
+    ParsedDate('1940-04~', start=(1940, 4, None), end=(1940, 4, None), precision='month', uncertain=False, approximate=True, rule='monthAndYearWithMonthInLangOrRoman')
+
+    >>> date = parseStructured("[zweite Hälfte des 17. Jahrhunderts]")
+    >>> date.edtf, date.startYear, date.endYear
+    ('1650/1699', 1650, 1699)
+
+    >>> parseStructured("o.J.") is None
+    True
+    """
+    return defaultParser(languages).parseStructured(dateString)
+
+def parseMany(dateStrings, languages=None):
     """
+    Parse an iterable of date strings into EDTF Format, returning the results in input order.
+    Identical date strings are only parsed once. Languages are selected as in parse.
+
+    >>> parseMany(["um 1920", "4 December 1920", "um 1920"])
+    ['1920?', '1920-12-04', '1920?']
 
-    pattern = extractPattern(dateString)
-    return interpret(dateString, pattern)
+    >>> parseMany(line for line in ["1751", "o.J."])
+    ['1751', None]
+    """
+    return defaultParser(languages).parseMany(dateStrings)
+
+def parseSafe(dateString, languages=None):
+    """
+    Parse a date string into EDTF Format without ever raising, and return the EDTF date and None, or None and the
+    Failure that tells why the date string is not parsed. Languages are selected as in parse.
+
+    >>> parseSafe("1850")
+    ('1850', None)
+
+    >>> parseSafe("Mai 18x5")
+    (None, Failure(reason='extract failed', rule='monthAndYearWithMonthInLangOrRoman', detail='🌕 __x_'))
+    """
+    return defaultParser(languages).parseSafe(dateString)
+
+def parseManySafe(dateStrings, languages=None):
+    """
+    Parse an iterable of date strings into EDTF Format without ever raising, for bulk runs in which a bad row must
+    not stop the batch. Returns a Batch with the results and failures in input order and the counts of failures by
+    reason and rule. Languages are selected as in parse.
+
+    >>> batch = parseManySafe(["um 1920", "o.J.", "August 19v0"])
+    >>> batch.counts.info()
+    {'total': 3, 'parsed': 1, 'failed': 2, 'reasons': {'no rule matched': 1, 'extract failed': 1}, 'rules': {'monthAndYearWithMonthInLangOrRoman': {'extract failed': 1}}}
+    """
+    return defaultParser(languages).parseManySafe(dateStrings)
+
+def parseStream(records, key=None, chunkSize=None, languages=None):
+    """
+    Lazily parses a stream of date strings or records, such as lines of a file that is being read or messages of a
+    queue. Yields pairs of each record and its EDTF date. A key function extracts the date string from records that
+    are not strings themselves. Languages are selected as in parse.
+
+    >>> stream = parseStream(iter([{'date': 'um 1900'}, {'date': '19. Jh.'}]), key=lambda record: record['date'])
+    >>> next(stream)
+    ({'date': 'um 1900'}, '1900?')
+
+    With a chunk size, records are read and parsed in chunks, and each chunk is yielded as a list of pairs once it has
+    been parsed. Callers can then act on a whole chunk at once, for instance to commit the offset of its last record.
+
+    >>> list(parseStream(["1751", "1848", "1751"], chunkSize=2))
+    [[('1751', '1751'), ('1848', '1848')], [('1751', '1751')]]
+    """
+    return defaultParser(languages).parseStream(records, key, chunkSize)
 
 if __name__ == '__main__':
     import doctest
-    doctest.testmod()
\ No newline at end of file
+    doctest.testmod()
@@ -0,0 +1,169 @@
+try:
+    import numpy
+except ImportError:
+    numpy = None
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+try:
+    from sariDateParser.dateParser import parse, parseStructured
+    import sariDateParser.lib.Calendar as Calendar
+    import sariDateParser.lib.ParsedDate as ParsedDate
+except ImportError:
+    from dateParser import parse, parseStructured
+    import lib.Calendar as Calendar
+    import lib.ParsedDate as ParsedDate
+
+# Codes of the precision of an interval. Date strings that could not be parsed have code NONE.
+NONE = 0
+PRECISIONS = {ParsedDate.DAY: 1, ParsedDate.MONTH: 2, ParsedDate.YEAR: 3, ParsedDate.CENTURY: 4}
+PRECISIONMASK = 7
+# Flags added to the precision code
+UNCERTAIN = 8
+APPROXIMATE = 16
+
+# Ordinal days used for the missing bound of open intervals, and for both bounds of unparsed date strings
+OPENSTART = -(2 ** 62)
+OPENEND = 2 ** 62
+UNPARSED = 0
+
+# Number of days of each month in a common year and before each month, by month number
+DAYSINMONTH = [0] + [Calendar.DAYSINMONTH['%02d' % month] for month in range(1, 13)]
+DAYSBEFOREMONTH = [0] + [sum(DAYSINMONTH[1:month]) for month in range(1, 13)]
+
+def ordinal(year, month=1, day=1):
+    """
+    Returns the proleptic Gregorian ordinal of a day, where 1 January of year 1 is day 1, as in datetime.date.toordinal.
+    Unlike datetime, years before 1 are allowed. Ordinals follow the Gregorian rule before constants.GREGORIANYEAR
+    as well, so that they convert to NumPy dates: the 29 February of a Julian leap year such as 1700, which parse
+    accepts, is counted as 1 March.
+
+    >>> from datetime import date
+    >>> ordinal(1940, 4, 30) == date(1940, 4, 30).toordinal()
+    True
+
+    >>> ordinal(0, 12, 31), ordinal(1700, 2, 29) == ordinal(1700, 3, 1)
+    (0, True)
+    """
+    month = min(max(month, 1), 12)
+    before = year - 1
+    days = 365 * before + before // 4 - before // 100 + before // 400 + DAYSBEFOREMONTH[month] + day
+    if month > 2 and Calendar.isGregorianLeapYear(year):
+        days += 1
+    return days
+
+def lastDay(year, month):
+    """
+    Returns the number of days of a month
+
+    >>> lastDay(1900, 2), lastDay(2000, 2)
+    (28, 29)
+    """
+    if month == 2 and Calendar.isGregorianLeapYear(year):
+        return 29
+    return DAYSINMONTH[min(max(month, 1), 12)]
+
+def bounds(parsedDate):
+    """
+    Returns the ordinal days of the earliest and latest day of a parsed date and its precision code
+
+    >>> bounds(parseStructured("ca. April 1940")) == (ordinal(1940, 4, 1), ordinal(1940, 4, 30), PRECISIONS['month'] | APPROXIMATE)
+    True
+
+    >>> bounds(None)
+    (0, 0, 0)
+    """
+    if parsedDate is None:
+        return UNPARSED, UNPARSED, NONE
+    if parsedDate.startYear is None:
+        lower = OPENSTART
+    else:
+        lower = ordinal(parsedDate.startYear, parsedDate.startMonth or 1, parsedDate.startDay or 1)
+    if parsedDate.endYear is None:
+        upper = OPENEND
+    else:
+        year, month = parsedDate.endYear, parsedDate.endMonth or 12
+        upper = ordinal(year, month, parsedDate.endDay or lastDay(year, month))
+    code = PRECISIONS[parsedDate.precision]
+    if parsedDate.uncertain:
+        code |= UNCERTAIN
+    if parsedDate.approximate:
+        code |= APPROXIMATE
+    return lower, upper, code
+
+def parseToIntervals(dateStrings, languages=None):
+    """
+    Parses date strings into three NumPy arrays: the ordinal days of the earliest and latest day of each date,
+    and a code of its precision with the UNCERTAIN and APPROXIMATE flags. Identical date strings are only parsed once.
+    Open bounds are OPENSTART and OPENEND, and date strings that could not be parsed have bounds UNPARSED and code NONE.
+    Languages are selected as in parse.
+
+    >>> lower, upper, code = parseToIntervals(["19. Jh.", "um 1900", "o.J.", "19. Jh."])
+    >>> [str(numpy.datetime64('0001-01-01') + (day - 1)) for day in lower[:2]]
+    ['1800-01-01', '1900-01-01']
+    >>> (upper - lower + 1).tolist()
+    [36524, 365, 1, 36524]
+    >>> code.tolist()
+    [4, 11, 0, 4]
+    """
+    if numpy is None:
+        raise ImportError("parseToIntervals requires numpy")
+    codes, uniqueDateStrings = factorize(dateStrings)
+    lower, upper, code = uniqueIntervals(uniqueDateStrings, languages)
+    return lower[codes], upper[codes], code[codes]
+
+def factorize(dateStrings):
+    """
+    Returns an array of the index of each date string in a list of the unique date strings, and that list
+    """
+    index = {}
+    codes = numpy.fromiter((index.setdefault(dateString, len(index)) for dateString in dateStrings), dtype=numpy.intp)
+    return codes, list(index)
+
+def uniqueIntervals(uniqueDateStrings, languages=None):
+    """
+    Returns arrays of the bounds and precision codes of date strings
+    """
+    lower = numpy.empty(len(uniqueDateStrings), dtype=numpy.int64)
+    upper = numpy.empty(len(uniqueDateStrings), dtype=numpy.int64)
+    code = numpy.empty(len(uniqueDateStrings), dtype=numpy.int8)
+    for i, dateString in enumerate(uniqueDateStrings):
+        parsedDate = parseStructured(dateString, languages) if isinstance(dateString, str) and dateString else None
+        lower[i], upper[i], code[i] = bounds(parsedDate)
+    return lower, upper, code
+
+if pandas is not None:
+    @pandas.api.extensions.register_series_accessor('dates')
+    class DatesAccessor:
+        """
+        Parses a Series of date strings as a whole, with `series.dates.edtf()` and `series.dates.intervals()`.
+        Each distinct date string is only parsed once. Missing values are not parsed.
+
+        >>> series = pandas.Series(["um 1900", None, "19. Jh.", "um 1900"])
+        >>> series.dates.edtf().tolist()
+        ['1900?', None, '18XX', '1900?']
+        >>> series.dates.intervals()['code'].tolist()
+        [11, 0, 4, 11]
+        """
+        def __init__(self, series):
+            self._series = series
+
+        def _factorize(self):
+            codes, uniques = pandas.factorize(self._series, use_na_sentinel=False)
+            return codes, [value if isinstance(value, str) else None for value in uniques]
+
+        def edtf(self, languages=None):
+            codes, uniques = self._factorize()
+            edtf = numpy.array([parse(value, languages) if value else None for value in uniques], dtype=object)
+            return pandas.Series(edtf[codes], index=self._series.index, name=self._series.name, dtype=object)
+
+        def intervals(self, languages=None):
+            codes, uniques = self._factorize()
+            lower, upper, code = uniqueIntervals(uniques, languages)
+            return pandas.DataFrame({'lower': lower[codes], 'upper': upper[codes], 'code': code[codes]}, index=self._series.index)
+
+if __name__ == '__main__' and numpy is not None:
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,100 @@
+"""
+Checks of calendar dates in the zero-padded strings that parsers extract, with tables computed once at import so
+that checking a date costs a set lookup
+
+Years before constants.GREGORIANYEAR follow the Julian leap rule and later years the Gregorian one. The days skipped
+when a region adopted the Gregorian calendar are not checked, since sources of those years may use either calendar.
+"""
+try:
+    import sariDateParser.lib.constants as constants
+except ImportError:
+    try:
+        import lib.constants as constants
+    except ImportError:
+        import constants as constants
+
+# Number of days of each month in a common year, by the month as parsers extract it
+DAYSINMONTH = {'%02d' % month: days for month, days in enumerate([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], 1)}
+
+# Months and days, as MM-DD, that exist in every year
+DAYS = frozenset('%s-%02d' % (month, day) for month, days in DAYSINMONTH.items() for day in range(1, days + 1))
+LEAPDAY = '02-29'
+
+# Four-digit years of two-digit years for each default century or pivot year, computed on first use
+_fullYears = {}
+
+def isLeapYear(year):
+    """
+    Returns whether a year has a 29 February, by the Julian rule before constants.GREGORIANYEAR and the Gregorian rule
+    from then on
+
+    >>> isLeapYear(1500), isLeapYear(1700), isLeapYear(1900), isLeapYear(2000), isLeapYear(1861)
+    (True, True, False, True, False)
+    """
+    if year < constants.GREGORIANYEAR:
+        return year % 4 == 0
+    return isGregorianLeapYear(year)
+
+def isGregorianLeapYear(year):
+    """
+    Returns whether a year is a leap year of the proleptic Gregorian calendar, in which datetime and NumPy count days
+
+    >>> isGregorianLeapYear(1700), isGregorianLeapYear(2000)
+    (False, True)
+    """
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+def isValidMonth(month):
+    """
+    Returns whether a zero-padded month exists
+
+    >>> isValidMonth('12'), isValidMonth('00'), isValidMonth('13')
+    (True, False, False)
+    """
+    return month in DAYSINMONTH
+
+def isValidDate(year, month, day):
+    """
+    Returns whether a date given as zero-padded strings exists
+
+    >>> isValidDate('1861', '02', '28'), isValidDate('1861', '02', '30'), isValidDate('1861', '04', '31')
+    (True, False, False)
+    >>> isValidDate('1500', '02', '29'), isValidDate('1700', '02', '29'), isValidDate('1900', '02', '29')
+    (True, True, False)
+    """
+    monthDay = month + '-' + day
+    return monthDay in DAYS or (monthDay == LEAPDAY and isLeapYear(int(year)))
+
+def fullYears(defaultCentury):
+    """
+    Returns the four-digit year of each two-digit year: in the default century if it is given with two digits, or in
+    the hundred years from the pivot year if it is given with four
+
+    >>> years = fullYears('1930')
+    >>> years['30'], years['99'], years['00'], years['29']
+    ('1930', '1999', '2000', '2029')
+    >>> fullYears('19')['07']
+    '1907'
+    """
+    if len(defaultCentury) == 2 and defaultCentury.isdigit():
+        return {'%02d' % year: defaultCentury + '%02d' % year for year in range(100)}
+    if len(defaultCentury) == 4 and defaultCentury.isdigit():
+        pivot = int(defaultCentury)
+        return {'%02d' % year: '%04d' % (pivot + (year - pivot) % 100) for year in range(100)}
+    raise ValueError("Default century must be a century of two digits or a pivot year of four digits, not %r" % defaultCentury)
+
+def fullYear(year, defaultCentury):
+    """
+    Returns the four-digit year of a year given with two digits, as in fullYears
+
+    >>> fullYear('36', '19'), fullYear('36', '1930'), fullYear('29', '1930')
+    ('1936', '1936', '2029')
+    """
+    years = _fullYears.get(defaultCentury)
+    if years is None:
+        years = _fullYears[defaultCentury] = fullYears(defaultCentury)
+    return years[year]
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,272 @@
+"""
+Registry of compiled regular expressions used by the date parser
+
+Patterns that depend on the terms of languages are compiled once for each combination of language packs
+by forLanguages, and the others once in build. Both happen on first use rather than when the module is
+imported, so that extracting and interpreting a date string does not rebuild any alternation and importing
+the parser stays cheap. The patterns of the default languages are also attributes of this module.
+"""
+import itertools
+import threading
+
+try:
+    import sariDateParser.lib.constants as constants
+    import sariDateParser.lib.LanguagePacks as LanguagePacks
+    import sariDateParser.lib.TermIndex as TermIndex
+    import sariDateParser.lib.TestPatterns as TestPatterns
+except ImportError:
+    try:
+        import lib.constants as constants
+        import lib.LanguagePacks as LanguagePacks
+        import lib.TermIndex as TermIndex
+        import lib.TestPatterns as TestPatterns
+    except ImportError:
+        import constants as constants
+        import LanguagePacks as LanguagePacks
+        import TermIndex as TermIndex
+        import TestPatterns as TestPatterns
+
+def alternation(terms, escapeDots=False, groupEach=True):
+    """
+    Joins a list of terms into a regular expression alternation
+
+    >>> alternation(["Jan", "Feb"])
+    '(Jan)|(Feb)'
+
+    >>> alternation(["1.", "erste"], escapeDots=True, groupEach=False)
+    '(1\\\\.|erste)'
+    """
+    if groupEach:
+        pattern = r'(' + ')|('.join(terms) + ')'
+    else:
+        pattern = r'(' + '|'.join(terms) + ')'
+    if escapeDots:
+        pattern = pattern.replace('.', r'\.')
+    return pattern
+
+def monthTerms(months):
+    """
+    Returns all terms of a mapping of months to their terms, ordered by month and variation
+
+    >>> monthTerms(constants.ROMANMONTHTERMS)[:3]
+    ['VIII', 'VII', 'XII']
+    """
+    return [month for variations in months.values() for month in variations]
+
+def unique(terms):
+    """
+    Returns terms without repetitions, in the order in which they first occur
+
+    >>> unique(["ca.", "um", "ca."])
+    ['ca.', 'um']
+    """
+    return list(dict.fromkeys(terms))
+
+def guarded(term, guards):
+    """
+    Returns a pattern matching term, unless one of the guards matches at any of its characters after the first.
+    Guards are given as triples of a term, whether it is matched regardless of case, and the pattern that matches it.
+
+    >>> guarded("IX", [("Xbr", True, "(?i:Xbr)"), ("Jan", True, "(?i:Jan)")])
+    'I(?!(?i:Xbr))X'
+
+    >>> guarded("Jh", [("Xbr", True, "(?i:Xbr)")])
+    'Jh'
+    """
+    import re
+
+    def overlaps(guard, ignoreCase, remainder):
+        common = min(len(guard), len(remainder))
+        if ignoreCase:
+            return guard[:common].lower() == remainder[:common].lower()
+        return guard[:common] == remainder[:common]
+
+    pattern = re.escape(term[0])
+    for i in range(1, len(term)):
+        matchingHere = []
+        for guard, ignoreCase, guardPattern in guards:
+            if overlaps(guard, ignoreCase, term[i:]) and guardPattern not in matchingHere:
+                matchingHere.append(guardPattern)
+        if matchingHere:
+            pattern += '(?!' + '|'.join(matchingHere) + ')'
+        pattern += re.escape(term[i])
+    return pattern
+
+# Order of language preference for month detections
+LANGORDER = constants.DEFAULTLANGUAGES
+
+# Patterns used by interpret, in the order in which they are tested
+TESTORDER = ['singleDate', 'fullDateWithMonthInLangOrRoman', 'monthAndYearWithMonthInLangOrRoman', 'singleYearWithQualifier', 'beforeYearWithQualifier', 'afterYearWithQualifier', 'yearRangeWithQualifier', 'yearWithPlaceHolderAndQualifier', 'centuryRange', 'midCentury', 'century', 'singleYearRelaxed']
+
+# Characters without which a test pattern cannot match
+REQUIREDCHARACTERS = {
+    'singleDate': '.',
+    'fullDateWithMonthInLangOrRoman': '🌕',
+    'monthAndYearWithMonthInLangOrRoman': '🌕',
+    'yearWithPlaceHolderAndQualifier': '-',
+    'centuryRange': '¢',
+    'midCentury': '½¢',
+    'century': '¢'
+}
+FEATURES = ''.join(sorted(set(''.join(REQUIREDCHARACTERS.values()))))
+
+# Suffixes of month terms and terms for unknown digits, which are the same in all languages
+UNKNOWNTERMS = ['XX', 'xx']
+MONTHSUFFIXES = ['r', 're', 's', 'br', 'st', 'obr', 'ob', 't']
+
+def features(pattern):
+    """
+    Returns which of the characters required by any test pattern occur in a pattern
+
+    >>> features("__. ¢") == tuple(c in '.¢' for c in FEATURES)
+    True
+    """
+    return tuple([c in pattern for c in FEATURES])
+
+def dispatchTable(tests, order):
+    """
+    Returns the tests that can match, in the given order, for each combination of features of a pattern,
+    as pairs of their name and search function
+
+    >>> import re
+    >>> table = dispatchTable({'century': re.compile('¢'), 'singleYearRelaxed': re.compile('____')}, ['singleYearRelaxed', 'century'])
+    >>> [test for test, search in table[features("____")]]
+    ['singleYearRelaxed']
+    """
+    table = {}
+    for present in itertools.product([False, True], repeat=len(FEATURES)):
+        presentCharacters = [c for c, isPresent in zip(FEATURES, present) if isPresent]
+        table[present] = [(test, tests[test].search) for test in order if all(c in presentCharacters for c in REQUIREDCHARACTERS.get(test, ''))]
+    return table
+
+class Patterns:
+    """
+    Patterns compiled for the terms of a combination of language packs, given in order of preference
+
+    >>> patterns = Patterns(('fr',))
+    >>> patterns.TOKEN.match("Juin").lastgroup, patterns.TOKEN.match("Juni")
+    ('MONTH', None)
+    """
+
+    def __init__(self, languages):
+        import re
+
+        packs = [LanguagePacks.load(lang) for lang in languages]
+        self.languages = tuple(languages)
+        self.INDEX = TermIndex.buildIndex(languages)
+
+        # Month terms in any of the languages, and in any of them or roman numerals, preferring the longest term
+        self.MONTHTERMSPATTERN = '(?i:' + self.INDEX.pattern([TermIndex.MONTH]) + ')'
+        self.ALLMONTHTERMSPATTERN = '(?i:' + self.INDEX.pattern([TermIndex.MONTH, TermIndex.ROMANMONTH]) + ')'
+        self.LANGUAGEMONTHTERMS = [month for pack in packs for month in monthTerms(pack['months'])]
+        self.CENTURYTERMS = unique(term for pack in packs for term in pack['century'])
+        self.MIDTERMS = unique(term for pack in packs for term in pack['half'])
+        self.CARDINALTERMS = unique(term for cardinal, numerals in constants.CARDINALNUMERALS.items() for term in numerals + [t for pack in packs for t in pack['cardinals'].get(cardinal, [])])
+        self.QUALIFIERWORDS = [re.escape(q) for q in unique(q for pack in packs for q in pack['qualifiers'])]
+        self.QUALIFIERSIGNS = [re.escape(q) for q in constants.QUALIFIERSIGNS]
+        self.UNCERTAINTYQUALIFIERS = '|'.join(self.QUALIFIERWORDS + self.QUALIFIERSIGNS)
+
+        # Patterns used by DateStringParsers
+        self.UNCERTAINTY = re.compile(r'(' + self.UNCERTAINTYQUALIFIERS + ')')
+        self.FULLDATE = re.compile(r'(\d{1,2})(?:t|\.|\s)*' + self.ALLMONTHTERMSPATTERN + r'(?:\.|\s)*(?:\d{2,4})', flags=re.IGNORECASE)
+        # Without optional spaces around the terms between cardinal and digits, which include spaces, so that they
+        # are not backtracked in every combination when no digits follow
+        self.MIDCENTURY = re.compile(r'(' + alternation(self.CARDINALTERMS, escapeDots=True, groupEach=False) + r')[A-zäöü|\s.]*(\d{1,2})')
+
+        # Pattern used by the Tokenizer. Each alternative stands for a token type, in the order in which
+        # extractPattern used to normalise them, and is guarded so that it never overlaps a term of a type
+        # with higher precedence.
+        monthGuards = [(month, True, '(?i:' + month + ')') for month in self.LANGUAGEMONTHTERMS]
+        unknownGuards = monthGuards + [(unknown, False, guarded(unknown, monthGuards)) for unknown in UNKNOWNTERMS]
+        digitMonths = [month for month in self.LANGUAGEMONTHTERMS if month[0].isdigit()]
+        self.TOKEN = re.compile('|'.join(alternative for alternative in [
+            r'(?P<MONTH>' + self.MONTHTERMSPATTERN + r')(?:(?!' + self.MONTHTERMSPATTERN + r')(?i:' + '|'.join(MONTHSUFFIXES) + r'))?' if self.LANGUAGEMONTHTERMS else None,
+            r'(?P<UNKNOWN>' + '|'.join(guarded(unknown, monthGuards) for unknown in UNKNOWNTERMS) + ')',
+            r'(?P<ROMANMONTH>' + '|'.join(guarded(month, unknownGuards) for month in monthTerms(constants.ROMANMONTHTERMS)) + ')',
+            r'(?P<CENTURY>' + '|'.join(guarded(term, unknownGuards) for term in self.CENTURYTERMS) + ')' if self.CENTURYTERMS else None,
+            r'(?P<HALF>' + '|'.join(guarded(term, unknownGuards) for term in self.MIDTERMS) + ')' if self.MIDTERMS else None,
+            r'(?P<QUALIFIER>' + (r'(?<!\w)(?:' + '|'.join(self.QUALIFIERWORDS) + r')(?!\w)|' if self.QUALIFIERWORDS else '') + '|'.join(self.QUALIFIERSIGNS) + ')',
+            r'(?P<DIGITS>\d' + (r'(?:(?!(?i:' + '|'.join(digitMonths) + r'))\d)*)' if digitMonths else r'\d*)')
+        ] if alternative))
+
+        # Patterns used by interpret
+        terms = {
+            'qualifiers': self.UNCERTAINTYQUALIFIERS,
+            'cardinals': '|'.join(term.replace('.', r'\.') for term in self.CARDINALTERMS).translate(str.maketrans('0123456789', '_' * 10))
+        }
+        self.TESTS = {test: re.compile(getattr(TestPatterns, test) % terms) for test in TESTORDER}
+
+        self.DISPATCH = dispatchTable(self.TESTS, TESTORDER)
+
+_compiled = {}
+_compileLock = threading.Lock()
+
+def forLanguages(languages=None):
+    """
+    Returns the patterns compiled for a combination of languages, in order of preference, or for the default
+    languages if None. Patterns are compiled on first use and kept for the default languages and for the last
+    constants.MAXLANGUAGECOMBINATIONS combinations compiled.
+
+    >>> forLanguages(['de', 'fr']) is forLanguages(('de', 'fr'))
+    True
+
+    >>> forLanguages().languages
+    ('de', 'en', 'fr')
+    """
+    key = DEFAULTLANGUAGES if languages is None else (languages,) if isinstance(languages, str) else tuple(languages)
+    patterns = _compiled.get(key)
+    if patterns is None:
+        with _compileLock:
+            patterns = _compiled.get(key)
+            if patterns is None:
+                patterns = Patterns(key)
+                others = [other for other in _compiled if other != DEFAULTLANGUAGES]
+                if len(others) >= constants.MAXLANGUAGECOMBINATIONS:
+                    del _compiled[others[0]]
+                _compiled[key] = patterns
+    return patterns
+
+DEFAULTLANGUAGES = tuple(constants.DEFAULTLANGUAGES)
+
+_buildLock = threading.Lock()
+
+def build():
+    """
+    Builds and compiles all patterns that do not depend on the languages, and those of the default languages,
+    and sets them as attributes of this module. This is done on first access to any of them rather than on import,
+    so that short-lived processes that import the parser stay cheap.
+    """
+    import re
+
+    with _buildLock:
+        if 'DISPATCH' in globals():
+            return
+        # Pattern used to clean date strings
+        BRACKETS = re.compile(r'\[|\]')
+
+        # Patterns used by DateStringParsers
+        UNCERTAINTYPLACEHOLDER = re.compile(r'(ca|\?)')
+        YEAR = re.compile(r'(\d{4})\??')
+        YEARWITHQUALIFIER = re.compile(r'(\d{4}\??)')
+        FULLDATEYEAR = re.compile(r'((\d{2,4})$|(\d{4})|(\d{2,4}).?$)')
+        MONTHANDYEARYEAR = re.compile(r'((\d{2,4})\.?$|(\d{4}))')
+        MONTHSTRIP = re.compile(r'\.|\s')
+        NUMERICDATE = re.compile(r'(\d{1,4})\.(\d{1,2})\.(\d{2,4})')
+        YEARRANGE = re.compile(r'(?:ca\.)?\s?(?:zwischen)?\s?(\d{3,4})\??\s?(?:-|und|bis|ud|\/)\s?(?:vor)?\s?(\d{2,4})\??')
+        DECADEPLACEHOLDER = re.compile(r'(\d{3})-')
+        CENTURYPLACEHOLDER = re.compile(r'(\d{2})--')
+
+        built = dict(locals())
+        built.update((name, value) for name, value in vars(forLanguages()).items() if name.isupper())
+        globals().update({name: value for name, value in built.items() if name.isupper()})
+
+def __getattr__(name):
+    if name.isupper() and 'DISPATCH' not in globals():
+        build()
+        if name in globals():
+            return globals()[name]
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
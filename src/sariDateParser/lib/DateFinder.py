@@ -0,0 +1,191 @@
+"""
+Finding the dates in free text, such as descriptions and provenance notes
+
+Every test pattern requires digits, so only windows of the text around runs of digits are looked at, and text
+without digits costs a single search. Each window is tokenized once and reduced to its pattern, in which a combined
+pattern of all rules, with their anchors replaced by word boundaries, finds the spans that look like dates. Each
+span is then parsed like a date string of its own. Windows are bounded around the digits they contain and do not
+overlap, so finding the dates of a text takes time linear in its length.
+"""
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+try:
+    import sariDateParser.lib.CompiledPatterns as CompiledPatterns
+    import sariDateParser.lib.Tokenizer as Tokenizer
+except ImportError:
+    try:
+        import lib.CompiledPatterns as CompiledPatterns
+        import lib.Tokenizer as Tokenizer
+    except ImportError:
+        import CompiledPatterns as CompiledPatterns
+        import Tokenizer as Tokenizer
+
+# Characters before and after a run of digits that can belong to the same date, enough for qualifiers such as
+# "gezeichnet nach der Natur" and for halves and centuries such as "zweite Hälfte des 19. Jahrhunderts"
+BEFORE = 32
+AFTER = 16
+
+DIGITRUN = re.compile(r'\d+')
+
+# Anchors of test patterns, which only match whole date strings, are replaced by word boundaries
+STARTBOUNDARY = r'(?<!\w)'
+ENDBOUNDARY = r'(?![\w\-/])'
+
+# Date terms that touch a letter on one of these sides are part of a word, such as "Mai" in "Maisfeld"
+WORDSIDES = {
+    Tokenizer.MONTH: (True, True),
+    Tokenizer.ROMANMONTH: (True, True),
+    Tokenizer.UNKNOWN: (True, True),
+    Tokenizer.CENTURY: (True, False),
+    Tokenizer.HALF: (True, False)
+}
+
+# A date found in a text, with its offsets in the text, its EDTF date and the rule that interpreted it
+DateMatch = namedtuple('DateMatch', ['start', 'end', 'text', 'edtf', 'rule'])
+
+def unanchored(test):
+    """
+    Returns the source of a test pattern that matches dates inside a longer pattern: anchors are replaced by word
+    boundaries, and the pattern neither starts nor ends inside a run of digits
+
+    >>> unanchored(r'^(um)?\\s?(____)\\??$')
+    '(?<!_)(?<!\\\\w)(um)?\\\\s?(____)\\\\??(?![\\\\w\\\\-/])(?!_)'
+    """
+    if test.startswith('^'):
+        test = STARTBOUNDARY + test[1:]
+    if test.endswith('$') and not test.endswith('\\$'):
+        test = test[:-1] + ENDBOUNDARY
+    return '(?<!_)' + test + '(?!_)'
+
+_finders = {}
+_finderLock = threading.Lock()
+
+def finder(patterns, rules):
+    """
+    Returns the combined pattern of the tests of rules in the given order, compiled once for each combination of
+    languages and rules. The name of the group that matched is the rule whose test matched first.
+    """
+    key = (patterns.languages, tuple(rules))
+    compiled = _finders.get(key)
+    if compiled is None:
+        with _finderLock:
+            compiled = _finders.get(key)
+            if compiled is None:
+                compiled = _finders[key] = re.compile('|'.join('(?P<%s>%s)' % (rule, unanchored(patterns.TESTS[rule].pattern)) for rule in rules))
+    return compiled
+
+def windows(text):
+    """
+    Returns the ranges of a text around runs of digits that can contain a date, from the start of a word up to the
+    end of a word, merged where they overlap
+
+    >>> text = "Brief vom 2. Mai 1985 an seinen Bruder, der ihm erst im Winter darauf antwortete. Nachlass um 1900."
+    >>> [text[start:end] for start, end in windows(text)]
+    ['Brief vom 2. Mai 1985 an seinen Bruder,', 'darauf antwortete. Nachlass um 1900.']
+    """
+    ranges = []
+    size = len(text)
+    for match in DIGITRUN.finditer(text):
+        start = max(0, match.start() - BEFORE)
+        while start > 0 and start < match.start() and not text[start - 1].isspace():
+            start += 1
+        end = min(size, match.end() + AFTER)
+        limit = min(size, end + AFTER)
+        while end < limit and not text[end].isspace():
+            end += 1
+        if ranges and start <= ranges[-1][1]:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end])
+    return [(start, end) for start, end in ranges]
+
+def datesInRange(text, start, end, search, patterns, parseWithRule):
+    """
+    Returns the dates in a range of a text as DateMatch tuples. The range is reduced to its pattern, in which the
+    search function of the combined pattern finds the spans that look like dates, leftmost first. Each span is parsed
+    with parseWithRule, and when it cannot be parsed, the search goes on from the character after its start, so
+    that a shorter date inside it can still be found.
+    """
+    window = text[start:end]
+    # Brackets are removed by the tokenizer, their offsets are kept to map offsets back to the text
+    brackets = [match.start() - i for i, match in enumerate(CompiledPatterns.BRACKETS.finditer(window))] if '[' in window or ']' in window else []
+    generic = CompiledPatterns.BRACKETS.sub('', window) if brackets else window
+
+    parts = []
+    # Offsets of each token in the pattern and in the text without brackets, and whether it is a placeholder
+    shapeStarts = []
+    textStarts = []
+    replaced = []
+    shapeOffset = textOffset = 0
+    for token in Tokenizer.tokenize(window, patterns):
+        size = len(token.text)
+        if token.type == Tokenizer.DIGITS:
+            part = '_' * size
+        elif token.type in Tokenizer.PLACEHOLDERS:
+            before, after = WORDSIDES[token.type]
+            if (before and textOffset > 0 and generic[textOffset - 1].isalpha()) or (after and textOffset + size < len(generic) and generic[textOffset + size].isalpha()):
+                part = token.text
+            else:
+                part = Tokenizer.PLACEHOLDERS[token.type]
+        else:
+            part = token.text
+        parts.append(part)
+        shapeStarts.append(shapeOffset)
+        textStarts.append(textOffset)
+        replaced.append(len(part) != size)
+        shapeOffset += len(part)
+        textOffset += size
+    shapeStarts.append(shapeOffset)
+    textStarts.append(textOffset)
+    replaced.append(False)
+    shape = ''.join(parts)
+
+    def toText(offset, isEnd):
+        i = bisect_right(shapeStarts, offset) - 1
+        position = textStarts[i] + (0 if replaced[i] else offset - shapeStarts[i])
+        if brackets:
+            # Brackets next to a date belong to the text around it
+            position += bisect_left(brackets, position) if isEnd else bisect_right(brackets, position)
+        return start + position
+
+    found = []
+    position = 0
+    while True:
+        match = search(shape, position)
+        if match is None:
+            return found
+        spanStart, spanEnd = toText(match.start(), False), toText(match.end(), True)
+        dateString = text[spanStart:spanEnd]
+        spanStart += len(dateString) - len(dateString.lstrip())
+        spanEnd -= len(dateString) - len(dateString.rstrip())
+        dateString = text[spanStart:spanEnd]
+        # Unless a bracket is opened or closed inside the date
+        if text[spanStart - 1:spanStart] == '[' and dateString.count(']') > dateString.count('['):
+            spanStart -= 1
+        if text[spanEnd:spanEnd + 1] == ']' and dateString.count('[') > dateString.count(']'):
+            spanEnd += 1
+        dateString = text[spanStart:spanEnd]
+        edtf, rule = parseWithRule(dateString)
+        if edtf is None:
+            position = match.start() + 1
+        else:
+            found.append(DateMatch(spanStart, spanEnd, dateString, edtf, rule))
+            position = match.end()
+
+def findDates(text, patterns, rules, parseWithRule):
+    """
+    Returns the dates in a text as DateMatch tuples in text order, found with the tests of the rules in the given
+    order and parsed with parseWithRule
+    """
+    search = finder(patterns, rules).search
+    found = []
+    for start, end in windows(text):
+        found.extend(datesInRange(text, start, end, search, patterns, parseWithRule))
+    return found
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
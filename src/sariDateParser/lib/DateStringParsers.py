@@ -1,14 +1,27 @@
-import re
-
 try:
     import sariDateParser.lib.constants as constants
+    import sariDateParser.lib.Calendar as Calendar
+    import sariDateParser.lib.CompiledPatterns as CompiledPatterns
+    import sariDateParser.lib.ParsedDate as ParsedDate
+    import sariDateParser.lib.TermIndex as TermIndex
+    import sariDateParser.lib.Tokenizer as Tokenizer
 except ImportError:
     try:
-         import lib.constants as constants
+        import lib.constants as constants
+        import lib.Calendar as Calendar
+        import lib.CompiledPatterns as CompiledPatterns
+        import lib.ParsedDate as ParsedDate
+        import lib.TermIndex as TermIndex
+        import lib.Tokenizer as Tokenizer
     except ImportError:
         import constants as constants
+        import Calendar as Calendar
+        import CompiledPatterns as CompiledPatterns
+        import ParsedDate as ParsedDate
+        import TermIndex as TermIndex
+        import Tokenizer as Tokenizer
             
-def afterYearWithQualifier(dateString):
+def afterYearWithQualifier(dateString, tokens=None, structured=False, patterns=None, defaultCentury=constants.DEFAULTCENTURY):
     """
     Given a string that contains a year, interprets it as after that year
 
@@ -18,14 +31,16 @@ def afterYearWithQualifier(dateString):
     >>> afterYearWithQualifier("nach 1250?")
     '1250/'
     """
-    yearSearch = re.search(r'(\d{4})\??', dateString)
+    yearSearch = CompiledPatterns.YEAR.search(dateString)
     if not yearSearch:
         return None
     year = yearSearch.group(1)
-    year = year + "/"
-    return year
+    edtf = year + "/"
+    if structured:
+        return ParsedDate.interval(edtf, year, None)
+    return edtf
 
-def beforeYearWithQualifier(dateString):
+def beforeYearWithQualifier(dateString, tokens=None, structured=False, patterns=None, defaultCentury=constants.DEFAULTCENTURY):
     """
     Given a string that contains a year, interprets it as before that year
 
@@ -35,14 +50,16 @@ def beforeYearWithQualifier(dateString):
     >>> beforeYearWithQualifier("nach 1250?")
     '/1250'
     """
-    yearSearch = re.search(r'(\d{4})\??', dateString)
+    yearSearch = CompiledPatterns.YEAR.search(dateString)
     if not yearSearch:
         return None
     year = yearSearch.group(1)
-    year = "/" + year
-    return year
+    edtf = "/" + year
+    if structured:
+        return ParsedDate.interval(edtf, None, year)
+    return edtf
 
-def century(dateString):
+def century(dateString, tokens=None, structured=False, patterns=None, defaultCentury=constants.DEFAULTCENTURY):
     """
     Given a string containing one or two digits, interprets it as a century in EDTF format
 
@@ -52,14 +69,18 @@ def century(dateString):
     >>> century("4. Jh.")
     '03XX'
     """
-    centurySearch = re.search(r'(\d{1,2})', dateString)
+    if tokens is None:
+        tokens = Tokenizer.tokenize(dateString, patterns)
+    centurySearch = Tokenizer.digits(tokens)
     if not centurySearch:
         return None
-    century = centurySearch.group(1)
+    century = centurySearch[0][:2]
     centuryEDTF = str(int(century)-1).zfill(2) ## EDTF uses YY for century. 19th century is 18
+    if structured:
+        return ParsedDate.interval(centuryEDTF + "XX", centuryEDTF + "00", centuryEDTF + "99", ParsedDate.CENTURY)
     return centuryEDTF + "XX"
 
-def centuryRange(dateString):
+def centuryRange(dateString, tokens=None, structured=False, patterns=None, defaultCentury=constants.DEFAULTCENTURY):
     """
     Given a string containing  two groups of digits, interprets it as a range of centuries in EDTF format
 
@@ -72,16 +93,20 @@ def centuryRange(dateString):
     >>> centuryRange("9/10. Jh.")
     '08XX/09XX'
     """
-    centurySearch = re.findall(r'(\d{1,2})', dateString)
+    if tokens is None:
+        tokens = Tokenizer.tokenize(dateString, patterns)
+    centurySearch = [d[i:i+2] for d in Tokenizer.digits(tokens) for i in range(0, len(d), 2)]
     if len(centurySearch) <2:
         return None
     centuryFrom = centurySearch[0]
     centuryTo = centurySearch[1]
     centuryFromEDTF = str(int(centuryFrom)-1).zfill(2) ## EDTF uses YY for century. 19th century is 18
     centuryToEDTF = str(int(centuryTo)-1) .zfill(2)
+    if structured:
+        return ParsedDate.interval(centuryFromEDTF + "XX/" + centuryToEDTF + "XX", centuryFromEDTF + "00", centuryToEDTF + "99", ParsedDate.CENTURY)
     return centuryFromEDTF + "XX/" + centuryToEDTF + "XX"
 
-def fullDateWithMonthInLangOrRoman(dateString):
+def fullDateWithMonthInLangOrRoman(dateString, tokens=None, structured=False, patterns=None, defaultCentury=constants.DEFAULTCENTURY):
     """
     Given a string containing a date with month written as a name or in roman numerals, returns the date in EDTF format
 
@@ -108,41 +133,46 @@ def fullDateWithMonthInLangOrRoman(dateString):
 
     >>> fullDateWithMonthInLangOrRoman("19. 8br. 1803.")
     '1803-10-19'
+
+    >>> fullDateWithMonthInLangOrRoman("30 Feb 1861")
+    '1861-02'
+
+    >>> fullDateWithMonthInLangOrRoman("2 Feb 20", defaultCentury='1930')
+    '2020-02-02'
     """
-    allMonthsInLanguagePattern = '(' + ')|('.join(constants.ALLMONTHLANGUAGETERMS) + ')'
-    allMonthsPattern = '(' + ')|('.join(constants.ALLMONTHTERMS) + ')'
-    datePattern = r'(\d{1,2})(?:t|\.|\s)*(?:' + allMonthsPattern + ')(?:\.|\s)*(?:\d{2,4})'
-    yearPattern = r'((\d{2,4})$|(\d{4})|(\d{2,4}).?$)'
-    try:
-        date = re.search(datePattern, dateString, flags=re.IGNORECASE).group(1).zfill(2) 
-    except:
+    if patterns is None:
+        patterns = CompiledPatterns.forLanguages()
+    dateSearch = patterns.FULLDATE.search(dateString)
+    if not dateSearch:
         return None
-        
-    try:
-        monthWords = re.search(allMonthsInLanguagePattern, dateString, flags=re.IGNORECASE).group(0)
-        month = str(guessMonth(monthWords)).zfill(2)
-    except:
-        try: 
-            monthWords = re.search(allMonthsPattern, dateString, flags=re.IGNORECASE).group(0)
-            month = str(guessMonth(monthWords)).zfill(2)
-        except:
-            return None
+    date = dateSearch.group(1).zfill(2)
 
-    try:
-        year = re.search(yearPattern, dateString).group(1)
-        if len(year) == 2:
-            year = constants.DEFAULTCENTURY + year
-        year = year.zfill(4)
-    except:
+    if tokens is None:
+        tokens = Tokenizer.tokenize(dateString, patterns)
+    month = Tokenizer.firstMonth(tokens)
+    if month is None:
         return None
+    month = month.zfill(2)
+
+    yearSearch = CompiledPatterns.FULLDATEYEAR.search(dateString)
+    if not yearSearch:
+        return None
+    year = yearSearch.group(1)
+    if len(year) == 2:
+        year = Calendar.fullYear(year, defaultCentury)
+    year = year.zfill(4)
     
-    if int(date) > 31:
-        # assume a year has been misinterpreted as date
+    if not Calendar.isValidDate(year, month, date):
+        # The day does not exist in the month, or a year has been misinterpreted as the day. A day of 0 is unknown.
+        if structured:
+            return ParsedDate.date('-'.join([year, month]), year, month, invalid=None if date == '00' else '-'.join([year, month, date]))
         return '-'.join([year, month])
     else:
+        if structured:
+            return ParsedDate.date('-'.join([year, month, date]), year, month, date)
         return '-'.join([year, month, date])
 
-def guessMonth(monthString):
+def guessMonth(monthString, patterns=None):
     """
     Given a string that contains a (only) term for a month either in text or roman numerals returns the month as a number
 
@@ -164,16 +194,14 @@ def guessMonth(monthString):
     >>> guessMonth("2.10.10")
     
     """
-    testOrder = ['de', 'en', 'fr', 'roman']
-    monthString = re.sub(r'\.|\s', '', monthString)
-    for lang in testOrder:
-        for i in constants.MONTHTERMS[lang].keys():
-            for monthVariation in constants.MONTHTERMS[lang][i]:
-                if monthVariation.lower() == monthString.lower():
-                    return i
-    return None
+    if patterns is None:
+        patterns = CompiledPatterns.forLanguages()
+    term = patterns.INDEX.lookup(CompiledPatterns.MONTHSTRIP.sub('', monthString))
+    if term is None or term.kind not in (TermIndex.MONTH, TermIndex.ROMANMONTH):
+        return None
+    return term.value
     
-def midCentury(dateString):
+def midCentury(dateString, tokens=None, structured=False, patterns=None, defaultCentury=constants.DEFAULTCENTURY):
     """
     Given a string that contains a statement about either half of a century, returns a date in EDTF format
 
@@ -189,23 +217,27 @@ def midCentury(dateString):
     >>> midCentury("2. H. 16. Jh.")
     '1550/1599'
     """
-    cardinalTermsPattern = '(' + '|'.join(constants.ALLCARDINALTERMS) + ')'
-    cardinalTermsPattern = cardinalTermsPattern.replace('.','\.')
-    centurySearch = re.search(r'(' + cardinalTermsPattern + ')\s?[A-zäöü|\s|\.]*\s?(\d{1,2})', dateString)
+    if patterns is None:
+        patterns = CompiledPatterns.forLanguages()
+    centurySearch = patterns.MIDCENTURY.search(dateString)
     if not centurySearch:
         return None
-    uncertain = re.search(r'(' + constants.UNCERTAINTYQUALIFIERS + ')', dateString)
+    uncertain = patterns.UNCERTAINTY.search(dateString)
     half = centurySearch.group(1)
     century = centurySearch.group(3)
     centuryEDTF = str(int(century)-1)
     qualifier = '?' if uncertain else ''
-    whichHalf = [d for d in constants.CARDINALTERMS.keys() if half in constants.CARDINALTERMS[d]][0]
+    whichHalf = patterns.INDEX.lookup(half).value
     if whichHalf == 1:
-        return centuryEDTF + "00" + qualifier + "/" + centuryEDTF + "50" + qualifier
+        start, end = centuryEDTF + "00", centuryEDTF + "50"
     else:
-        return centuryEDTF + "50" + qualifier + "/" + centuryEDTF + "99" + qualifier
+        start, end = centuryEDTF + "50", centuryEDTF + "99"
+    edtf = start + qualifier + "/" + end + qualifier
+    if structured:
+        return ParsedDate.interval(edtf, start, end, uncertain=bool(uncertain))
+    return edtf
 
-def monthAndYearWithMonthInLangOrRoman(dateString):
+def monthAndYearWithMonthInLangOrRoman(dateString, tokens=None, structured=False, patterns=None, defaultCentury=constants.DEFAULTCENTURY):
     """
     Given a string containing a date expressed by a month term and a year returns the date in EDTF format
 
@@ -223,36 +255,37 @@ def monthAndYearWithMonthInLangOrRoman(dateString):
 
     >>> monthAndYearWithMonthInLangOrRoman("im 9br 1792")
     '1792-11'
+
+    >>> monthAndYearWithMonthInLangOrRoman("Febr. 36.", defaultCentury='18')
+    '1836-02'
     """
-    allMonthsInLanguagePattern = '(' + ')|('.join(constants.ALLMONTHLANGUAGETERMS) + ')'
-    allMonthsPattern = '(' + ')|('.join(constants.ALLMONTHTERMS) + ')'
-    yearPattern = r'((\d{2,4})\.?$|(\d{4}))'
-    uncertain = re.search(r'(' + constants.UNCERTAINTYQUALIFIERS + ')', dateString)
+    if patterns is None:
+        patterns = CompiledPatterns.forLanguages()
+    uncertain = patterns.UNCERTAINTY.search(dateString)
     
     qualifier = '~' if uncertain else ''
         
-    try:
-        monthWords = re.search(allMonthsInLanguagePattern, dateString, flags=re.IGNORECASE).group(0)
-        month = str(guessMonth(monthWords)).zfill(2)
-    except:
-        try: 
-            monthWords = re.search(allMonthsPattern, dateString, flags=re.IGNORECASE).group(0)
-            month = str(guessMonth(monthWords)).zfill(2)
-        except:
-            return None
+    if tokens is None:
+        tokens = Tokenizer.tokenize(dateString, patterns)
+    month = Tokenizer.firstMonth(tokens)
+    if month is None:
+        return None
+    month = month.zfill(2)
 
-    try:
-        year = re.search(yearPattern, dateString).group(1).replace('.','')
-        if len(year) == 2:
-            year = constants.DEFAULTCENTURY + year
-        else:
-            year = year.zfill(4)
-    except:
+    yearSearch = CompiledPatterns.MONTHANDYEARYEAR.search(dateString)
+    if not yearSearch:
         return None
+    year = yearSearch.group(1).replace('.','')
+    if len(year) == 2:
+        year = Calendar.fullYear(year, defaultCentury)
+    else:
+        year = year.zfill(4)
     
+    if structured:
+        return ParsedDate.date('-'.join([year, month]) + qualifier, year, month, approximate=bool(uncertain))
     return '-'.join([year, month]) + qualifier
 
-def singleDate(dateString):
+def singleDate(dateString, tokens=None, structured=False, patterns=None, defaultCentury=constants.DEFAULTCENTURY):
     """
     Given a string containing a date expressed in numeric date format, returns it in EDTF
 
@@ -274,8 +307,29 @@ def singleDate(dateString):
     >>> singleDate("6.3.300")
     '0300-03-06'
 
+    >>> singleDate("31.2.1861"), singleDate("2.31.1861"), singleDate("31.31.1861")
+    ('1861-02', '1861-02', '1861')
+
+    >>> singleDate("29.2.1500"), singleDate("29.2.1700"), singleDate("29.2.1900")
+    ('1500-02-29', '1700-02-29', '1900-02')
+
+    A month or day of 0 is unknown, and is not swapped
+
+    >>> singleDate("5.0.1900"), singleDate("4.0.2163"), singleDate("0.5.1920")
+    ('1900', '2163', '1920-05')
+
+    Structured dates keep the impossible date that was reduced
+
+    >>> singleDate("31.2.1861", structured=True).invalid, singleDate("13.13.1861", structured=True).invalid, singleDate("0.5.1920", structured=True).invalid
+    ('1861-02-31', '1861-13-13', None)
+
+    >>> singleDate("6.III.1900") is None
+    True
+
     """
-    date = re.search(r'(\d{1,4})\.(\d{1,2})\.(\d{2,4})', dateString)
+    date = CompiledPatterns.NUMERICDATE.search(dateString)
+    if not date:
+        return None
     if len(date.group(1)) > 2:
         # YYYY.MM.DD format
         year = date.group(1).zfill(4)
@@ -285,13 +339,25 @@ def singleDate(dateString):
         year = date.group(3).zfill(4)
         month = date.group(2).zfill(2)
         day = date.group(1).zfill(2)
-    if int(month) > 12:
+    if int(month) > 12 and 1 <= int(day) <= 12:
         # Assume that month and day have been swapped
-        return '-'.join((year, day, month))
-    else:
+        month, day = day, month
+    if Calendar.isValidDate(year, month, day):
+        if structured:
+            return ParsedDate.date('-'.join((year, month, day)), year, month, day)
         return '-'.join((year, month, day))
+    # The day or the month does not exist, unless it is 0 for an unknown day or month
+    unknown = month == '00' or (day == '00' and Calendar.isValidMonth(month))
+    invalid = None if unknown else '-'.join((year, month, day))
+    if Calendar.isValidMonth(month):
+        if structured:
+            return ParsedDate.date('-'.join((year, month)), year, month, invalid=invalid)
+        return '-'.join((year, month))
+    if structured:
+        return ParsedDate.date(year, year, invalid=invalid)
+    return year
 
-def singleYearRelaxed(dateString):
+def singleYearRelaxed(dateString, tokens=None, structured=False, patterns=None, defaultCentury=constants.DEFAULTCENTURY):
     """
     Given a string that contains numbers, interprets those numbers as a year and returns it in EDTF
 
@@ -304,9 +370,9 @@ def singleYearRelaxed(dateString):
     >>> singleYearRelaxed("I think it must have been in 1530 because that's when the castle has been built")
     '1530?'
     """
-    return singleYearWithQualifier(dateString)
+    return singleYearWithQualifier(dateString, tokens, structured, patterns, defaultCentury)
     
-def singleYearWithQualifier(dateString):
+def singleYearWithQualifier(dateString, tokens=None, structured=False, patterns=None, defaultCentury=constants.DEFAULTCENTURY):
     """
     Given a string that contains four digits interprets it as a year
     
@@ -316,17 +382,19 @@ def singleYearWithQualifier(dateString):
     >>> singleYearWithQualifier("ca. 1830")
     '1830?'
     """
-    yearSearch = re.search(r'(\d{4}\??)', dateString)
+    yearSearch = CompiledPatterns.YEARWITHQUALIFIER.search(dateString)
     if not yearSearch:
         return None
     year = yearSearch.group(1)
-    uncertain = re.search(r'(' + constants.UNCERTAINTYQUALIFIERS + ')', dateString)
-    if uncertain and not '?' in year:
-        return year + "?"
-    else:
-        return year
-
-def yearWithPlaceHolderAndQualifier(dateString):
+    if patterns is None:
+        patterns = CompiledPatterns.forLanguages()
+    uncertain = patterns.UNCERTAINTY.search(dateString)
+    edtf = year + "?" if uncertain and not '?' in year else year
+    if structured:
+        return ParsedDate.date(edtf, year, uncertain='?' in edtf)
+    return edtf
+
+def yearWithPlaceHolderAndQualifier(dateString, tokens=None, structured=False, patterns=None, defaultCentury=constants.DEFAULTCENTURY):
     """
     Converts a string containing a year, in which the last one or two digits are unknown
 
@@ -339,18 +407,24 @@ def yearWithPlaceHolderAndQualifier(dateString):
     >>> yearWithPlaceHolderAndQualifier("17--?")
     '1700?/1799?'
     """
-    uncertain = re.search(r'(ca|\?)', dateString)
+    uncertain = CompiledPatterns.UNCERTAINTYPLACEHOLDER.search(dateString)
     quantifier = '?' if uncertain else ''
-    m = re.search(r'(\d{2})--', dateString)
+    m = CompiledPatterns.CENTURYPLACEHOLDER.search(dateString)
     if m:
         century = m.group(1)
-        return "%s00%s/%s99%s" % (century, quantifier, century, quantifier)
-    m = re.search(r'(\d{3})-', dateString)
+        edtf = "%s00%s/%s99%s" % (century, quantifier, century, quantifier)
+        if structured:
+            return ParsedDate.interval(edtf, century + "00", century + "99", uncertain=bool(uncertain))
+        return edtf
+    m = CompiledPatterns.DECADEPLACEHOLDER.search(dateString)
     if m:
         century = m.group(1)
-        return "%s0%s/%s9%s" % (century, quantifier, century, quantifier)
+        edtf = "%s0%s/%s9%s" % (century, quantifier, century, quantifier)
+        if structured:
+            return ParsedDate.interval(edtf, century + "0", century + "9", uncertain=bool(uncertain))
+        return edtf
 
-def yearRangeWithQualifier(dateString):
+def yearRangeWithQualifier(dateString, tokens=None, structured=False, patterns=None, defaultCentury=constants.DEFAULTCENTURY):
     """
     Converts a string containing two digits as a range of years
 
@@ -368,8 +442,13 @@ def yearRangeWithQualifier(dateString):
 
     >>> yearRangeWithQualifier("1870/1828")
     '1828/1870'
+
+    >>> yearRangeWithQualifier("1870") is None
+    True
     """
-    years = re.search(r'(?:ca\.)?\s?(?:zwischen)?\s?(\d{3,4})\??\s?(?:-|und|bis|ud|\/)\s?(?:vor)?\s?(\d{2,4})\??', dateString)
+    years = CompiledPatterns.YEARRANGE.search(dateString)
+    if not years:
+        return None
     yearsPair = [years.group(1), years.group(2)]
     if len(yearsPair[1]) < len(yearsPair[0]):
         # Accommodate for 1814/15 type of dates by taking century from first date
@@ -379,6 +458,8 @@ def yearRangeWithQualifier(dateString):
         # Make sure dates are in correct order and switch if necessary
         yearsPair = [yearsPair[1], yearsPair[0]]
     yearsPair = [yearsPair[0].zfill(4), yearsPair[1].zfill(4)]
+    if structured:
+        return ParsedDate.interval("/".join(yearsPair), yearsPair[0], yearsPair[1])
     return "/".join(yearsPair)
 
 if __name__ == '__main__':
@@ -0,0 +1,140 @@
+from collections import Counter, namedtuple
+
+try:
+    from sariDateParser.lib.Instrumentation import Histogram, STAGES
+except ImportError:
+    try:
+        from lib.Instrumentation import Histogram, STAGES
+    except ImportError:
+        from Instrumentation import Histogram, STAGES
+
+# Outcomes of a rule for a pattern
+MATCHED = 'matched'
+NOMATCH = 'no match'
+# The test pattern matches, but a rule tested before it matched first
+SHADOWED = 'shadowed'
+# The test pattern does not match and is only tested to find shadowed rules, since a rule tested before it matched
+UNREACHED = 'not reached'
+# The test pattern was not searched, since the pattern lacks a character that it requires
+SKIPPED = 'skipped'
+
+# The test of a rule, with the groups captured from the pattern if it matched and the duration of the search
+Trial = namedtuple('Trial', ['rule', 'outcome', 'groups', 'seconds'])
+
+class Explanation:
+    """
+    How a date string was interpreted: its pattern and tokens, the outcome of the test of every rule, the rule and
+    parser function that interpreted it, the result and the duration of each stage in seconds
+    """
+    __slots__ = ('dateString', 'pattern', 'tokens', 'trials', 'rule', 'parser', 'result', 'timings')
+
+    def __init__(self, dateString, pattern, tokens, trials, rule, parser, result, timings):
+        self.dateString = dateString
+        self.pattern = pattern
+        self.tokens = tokens
+        self.trials = trials
+        self.rule = rule
+        self.parser = parser
+        self.result = result
+        self.timings = timings
+
+    def __repr__(self):
+        return "Explanation(%r, pattern=%r, rule=%r, result=%r)" % (self.dateString, self.pattern, self.rule, self.result)
+
+    def __str__(self):
+        """
+        Returns a report of the explanation with one line for each rule
+
+        >>> print(Explanation("um 1900", "um ____", [], [Trial('century', SKIPPED, None, 0.0), Trial('singleYearWithQualifier', MATCHED, ('um', '____'), 0.000002)],
+        ...                   'singleYearWithQualifier', 'DateStringParsers.singleYearWithQualifier', '1900?', {'extractPattern': 0.000004, 'dispatch': 0.000002, 'parser': 0.000006}))
+        'um 1900' -> '1900?'
+        pattern   'um ____'
+        rule      singleYearWithQualifier (DateStringParsers.singleYearWithQualifier)
+        timings   extractPattern 4.0 µs, dispatch 2.0 µs, parser 6.0 µs
+          century                            skipped
+          singleYearWithQualifier            matched     2.0 µs  ('um', '____')
+        """
+        lines = [
+            "%r -> %r" % (self.dateString, self.result),
+            "pattern   %r" % self.pattern,
+            "rule      %s (%s)" % (self.rule, self.parser) if self.rule else "rule      None",
+            "timings   " + ', '.join("%s %.1f µs" % (stage, seconds * 1e6) for stage, seconds in self.timings.items())
+        ]
+        for trial in self.trials:
+            line = "  %-34s %-11s" % (trial.rule, trial.outcome)
+            if trial.outcome != SKIPPED:
+                line += " %.1f µs" % (trial.seconds * 1e6)
+            if trial.groups is not None:
+                line += "  %r" % (trial.groups,)
+            lines.append(line.rstrip())
+        return '\n'.join(lines)
+
+class ExplanationSummary:
+    """
+    Aggregates explanations of a corpus: how often each rule is tested, matches, is shadowed by an earlier rule or is
+    skipped, how often its parser returns no result, how long its tests and its parser take, which rules never match
+    and which patterns no rule matches
+
+    >>> summary = ExplanationSummary(['century', 'singleYearWithQualifier'])
+    >>> summary.add(Explanation("um 1900", "um ____", [], [Trial('century', SKIPPED, None, 0.0), Trial('singleYearWithQualifier', MATCHED, ('um', '____'), 0.000002)],
+    ...                         'singleYearWithQualifier', 'DateStringParsers.singleYearWithQualifier', '1900?', {'extractPattern': 0.000004, 'dispatch': 0.000002, 'parser': 0.000006}))
+    >>> summary.add(Explanation("o.J.", "o.J.", [], [Trial('century', SKIPPED, None, 0.0), Trial('singleYearWithQualifier', NOMATCH, None, 0.000001)],
+    ...                         None, None, None, {'extractPattern': 0.000003, 'dispatch': 0.000001}))
+    >>> info = summary.info()
+    >>> info['neverMatched'], info['unmatchedPatterns']
+    (['century'], [('o.J.', 1)])
+    >>> info['rules']['singleYearWithQualifier']['tested'], info['rules']['singleYearWithQualifier']['matched']
+    (2, 1)
+    """
+
+    def __init__(self, rules):
+        self.dateStrings = 0
+        self.unmatched = Counter()
+        self.outcomes = {rule: Counter() for rule in rules}
+        self.noResult = Counter()
+        self.tests = {rule: Histogram() for rule in rules}
+        self.parsers = {rule: Histogram() for rule in rules}
+        self.stages = {stage: Histogram() for stage in STAGES}
+
+    def add(self, explanation):
+        self.dateStrings += 1
+        for trial in explanation.trials:
+            self.outcomes[trial.rule][trial.outcome] += 1
+            # Only tests up to the matching one are searched when parsing
+            if trial.outcome in (MATCHED, NOMATCH):
+                self.tests[trial.rule].add(trial.seconds)
+        for stage, seconds in explanation.timings.items():
+            self.stages[stage].add(seconds)
+        if explanation.rule is None:
+            self.unmatched[explanation.pattern] += 1
+        else:
+            self.parsers[explanation.rule].add(explanation.timings['parser'])
+            if explanation.result is None:
+                self.noResult[explanation.rule] += 1
+
+    def info(self, patterns=10):
+        """
+        Returns the counts and latency histograms of each rule and stage, the rules that never matched and the most
+        common patterns that no rule matched
+        """
+        return {
+            'dateStrings': self.dateStrings,
+            'unmatched': sum(self.unmatched.values()),
+            'rules': {rule: {
+                'tested': outcomes[MATCHED] + outcomes[NOMATCH],
+                'matched': outcomes[MATCHED],
+                'shadowed': outcomes[SHADOWED],
+                'notReached': outcomes[UNREACHED],
+                'skipped': outcomes[SKIPPED],
+                'noResult': self.noResult[rule],
+                'test': self.tests[rule].info(),
+                'parser': self.parsers[rule].info()
+            } for rule, outcomes in self.outcomes.items()},
+            'neverMatched': [rule for rule, outcomes in self.outcomes.items() if not outcomes[MATCHED]],
+            'unmatchedPatterns': self.unmatched.most_common(patterns),
+            'stages': {stage: histogram.info() for stage, histogram in self.stages.items()}
+        }
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
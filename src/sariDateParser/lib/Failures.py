@@ -0,0 +1,117 @@
+"""
+Reasons why a date string is not parsed, for bulk runs that must neither raise on a bad row nor lose track of the
+rows without a date
+"""
+from collections import Counter, namedtuple
+
+try:
+    import sariDateParser.lib.Calendar as Calendar
+except ImportError:
+    try:
+        import lib.Calendar as Calendar
+    except ImportError:
+        import Calendar as Calendar
+
+# Reasons why a date string is not parsed
+NORULE = 'no rule matched'
+# The test of a rule matched the pattern, but its parser could not extract a date from the date string
+EXTRACTFAILED = 'extract failed'
+# The month or the day does not exist, and parse returns the date with a lower precision
+INVALIDDATE = 'invalid date'
+# The date string is longer than the maxLength of the parser
+TOOLONG = 'too long'
+# The parser raised an exception, or the rule has no parser
+ERROR = 'error'
+REASONS = (NORULE, EXTRACTFAILED, INVALIDDATE, TOOLONG, ERROR)
+
+# A date string that is not parsed, with the reason, the rule that matched its pattern (None if no rule matched) and
+# what went wrong: the pattern, the invalid EDTF date, the length or the exception
+Failure = namedtuple('Failure', ['reason', 'rule', 'detail'])
+
+# Results of a batch: the EDTF date or None and the Failure or None of each date string, and the FailureCounts.
+# Invalid dates have both the EDTF date with a lower precision and a Failure.
+Batch = namedtuple('Batch', ['results', 'failures', 'counts'])
+
+# Calendar dates of an EDTF date or interval, compiled on first use so that importing the parser does not load re
+EDTFDATE = r'(?<![\dX])(\d{4})-(\d{2})(?:-(\d{2}))?'
+_edtfDate = None
+
+def invalidDate(edtf):
+    """
+    Returns whether an EDTF date or interval contains a month or a day that does not exist
+
+    >>> invalidDate('1850-12-31'), invalidDate('1850/1899'), invalidDate('1850-31-12'), invalidDate('1861-02-29')
+    (False, False, True, True)
+    """
+    global _edtfDate
+    if _edtfDate is None:
+        import re
+        _edtfDate = re.compile(EDTFDATE)
+    for match in _edtfDate.finditer(edtf):
+        year, month, day = match.groups()
+        if not Calendar.isValidMonth(month) or (day is not None and not Calendar.isValidDate(year, month, day)):
+            return True
+    return False
+
+class FailureCounts:
+    """
+    Counts of the date strings of a batch that are parsed, and of those that are not by reason and by the rule that
+    matched them. Counts of batches parsed in other processes are added with update.
+
+    >>> counts = FailureCounts()
+    >>> for failure in [None, Failure(NORULE, None, 'o.J.'), Failure(EXTRACTFAILED, 'singleDate', '_.__.____')]:
+    ...     counts.add(failure)
+    >>> print(counts)
+    3 date strings, 1 parsed, 2 not parsed: 1 no rule matched, 1 extract failed
+    >>> counts.info()['rules']
+    {'singleDate': {'extract failed': 1}}
+    """
+    __slots__ = ('parsed', 'reasons', 'rules')
+
+    def __init__(self):
+        self.parsed = 0
+        self.reasons = Counter()
+        self.rules = Counter()
+
+    def add(self, failure, count=1):
+        if failure is None:
+            self.parsed += count
+            return
+        self.reasons[failure.reason] += count
+        if failure.rule is not None:
+            self.rules[failure.rule, failure.reason] += count
+
+    def update(self, other):
+        self.parsed += other.parsed
+        self.reasons.update(other.reasons)
+        self.rules.update(other.rules)
+
+    @property
+    def failed(self):
+        return sum(self.reasons.values())
+
+    def info(self):
+        """
+        Returns the number of date strings, of those parsed and not parsed, and the failures by reason and by rule
+        """
+        rules = {}
+        for (rule, reason), count in sorted(self.rules.items()):
+            rules.setdefault(rule, {})[reason] = count
+        return {
+            'total': self.parsed + self.failed,
+            'parsed': self.parsed,
+            'failed': self.failed,
+            'reasons': {reason: self.reasons[reason] for reason in REASONS if self.reasons[reason]},
+            'rules': rules
+        }
+
+    def __str__(self):
+        failed = self.failed
+        line = "%d date strings, %d parsed, %d not parsed" % (self.parsed + failed, self.parsed, failed)
+        if failed:
+            line += ': ' + ', '.join("%d %s" % (self.reasons[reason], reason) for reason in REASONS if self.reasons[reason])
+        return line
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
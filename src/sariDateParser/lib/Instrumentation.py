@@ -0,0 +1,101 @@
+from collections import Counter
+from threading import Lock
+
+# Stages of parsing a date string that are timed
+STAGES = ['extractPattern', 'dispatch', 'parser']
+
+class Histogram:
+    """
+    Counts durations in buckets whose upper bounds are powers of two microseconds
+
+    >>> histogram = Histogram()
+    >>> for seconds in [0.000003, 0.000005, 0.000040]:
+    ...     histogram.add(seconds)
+    >>> histogram.count, histogram.percentile(50), histogram.percentile(100)
+    (3, 8, 64)
+    """
+    BUCKETS = 32
+
+    def __init__(self):
+        self.buckets = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds):
+        bucket = int(seconds * 1e6).bit_length()
+        self.buckets[min(bucket, self.BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, percent):
+        """
+        Returns the upper bound in microseconds of the bucket that contains the given percentile
+        """
+        if not self.count:
+            return None
+        threshold = self.count * percent / 100
+        cumulative = 0
+        for bucket, count in enumerate(self.buckets):
+            cumulative += count
+            if cumulative >= threshold:
+                return 2 ** bucket
+        return 2 ** (self.BUCKETS - 1)
+
+    def info(self):
+        return {
+            'count': self.count,
+            'meanUs': self.total / self.count * 1e6 if self.count else None,
+            'p50Us': self.percentile(50),
+            'p99Us': self.percentile(99),
+            'buckets': {2 ** bucket: count for bucket, count in enumerate(self.buckets) if count}
+        }
+
+class Instrumentation:
+    """
+    Collects how often each rule matches and how long each stage of parsing takes, and passes every observation
+    to an optional callback
+
+    >>> observed = []
+    >>> instrumentation = Instrumentation(callback=lambda *observation: observed.append(observation))
+    >>> instrumentation.observe("um 1900", "um ____", "singleYearWithQualifier", "1900?", {'dispatch': 0.000002})
+    >>> instrumentation.observe("o.J.", "o.J.", None, None, {'dispatch': 0.000001})
+    >>> instrumentation.info()['rules']
+    {'singleYearWithQualifier': 1, None: 1}
+    >>> observed[1][:2]
+    ('o.J.', 'o.J.')
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.ruleCounts = Counter()
+        self.histograms = {stage: Histogram() for stage in STAGES}
+        self.resultCacheHits = 0
+        self._lock = Lock()
+
+    def observe(self, dateString, pattern, rule, result, timings):
+        """
+        Records that a date string with the given pattern was interpreted by a rule (None if no rule matched),
+        with the duration in seconds of each stage
+        """
+        with self._lock:
+            self.ruleCounts[rule] += 1
+            for stage, seconds in timings.items():
+                self.histograms[stage].add(seconds)
+        if self.callback:
+            self.callback(dateString, pattern, rule, result, timings)
+
+    def observeCacheHit(self):
+        with self._lock:
+            self.resultCacheHits += 1
+
+    def info(self):
+        with self._lock:
+            return {
+                'rules': dict(self.ruleCounts),
+                'stages': {stage: histogram.info() for stage, histogram in self.histograms.items()},
+                'resultCacheHits': self.resultCacheHits
+            }
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
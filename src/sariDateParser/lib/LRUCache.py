@@ -0,0 +1,67 @@
+from collections import namedtuple, OrderedDict
+from threading import Lock
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+# Returned by get for keys that are not in the cache, since None is a valid cached value
+MISSING = object()
+
+class LRUCache:
+    """
+    A size-bounded cache that evicts the least recently used entry and keeps hit and miss statistics
+
+    >>> cache = LRUCache(2)
+    >>> cache.put("um 1900", "1900?")
+    >>> cache.put("o.J.", None)
+    >>> cache.get("um 1900")
+    '1900?'
+    >>> cache.put("1751", "1751")
+    >>> cache.get("o.J.") is MISSING
+    True
+    >>> cache.info()
+    CacheInfo(hits=1, misses=1, maxsize=2, currsize=2)
+    """
+
+    def __init__(self, maxsize):
+        if maxsize < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def __len__(self):
+        return len(self._entries)
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,76 @@
+"""
+Language packs with the month, century, half, cardinal, qualifier and BCE terms of a language
+
+Each pack is a JSON file in the languages directory of the package, named after its language code.
+Packs are loaded on first use, and further packs can be added at runtime with register.
+"""
+import os
+
+DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'languages')
+
+# Keys of a language pack. Months and cardinals map a number to a list of terms, all others are lists of terms.
+KEYS = ['months', 'cardinals', 'century', 'half', 'qualifiers', 'bce']
+
+_packs = {}
+
+def available():
+    """
+    Returns the codes of all languages that have a pack
+
+    >>> available()[:3]
+    ['de', 'en', 'fr']
+    """
+    return sorted(set(_packs) | {name[:-len('.json')] for name in os.listdir(DIRECTORY) if name.endswith('.json')})
+
+def normalise(lang, pack):
+    """
+    Returns a pack with all keys, in which missing keys have no terms and cardinals are integers
+
+    >>> normalise('la', {'months': {'1': ['Ianuarius']}})['cardinals']
+    {}
+    """
+    unknown = set(pack) - set(KEYS)
+    if unknown:
+        raise ValueError("Unknown keys in language pack %s: %s" % (lang, ', '.join(sorted(unknown))))
+    return {
+        'months': {str(month): list(terms) for month, terms in pack.get('months', {}).items()},
+        'cardinals': {int(cardinal): list(terms) for cardinal, terms in pack.get('cardinals', {}).items()},
+        'century': list(pack.get('century', [])),
+        'half': list(pack.get('half', [])),
+        'qualifiers': list(pack.get('qualifiers', [])),
+        'bce': list(pack.get('bce', []))
+    }
+
+def load(lang):
+    """
+    Returns the pack of a language, reading it from its file on first use
+
+    >>> load('de')['century']
+    ['Jahrhundert', 'Jahrundert', 'Jht', 'Jh']
+    """
+    pack = _packs.get(lang)
+    if pack is None:
+        path = os.path.join(DIRECTORY, lang + '.json')
+        if not os.path.isfile(path):
+            raise ValueError("No language pack for %s, available are %s" % (lang, ', '.join(available())))
+        import json
+        with open(path, 'r', encoding='utf-8') as f:
+            pack = _packs.setdefault(lang, normalise(lang, json.load(f)))
+    return pack
+
+def register(lang, pack):
+    """
+    Adds a language pack, given as a dictionary with any of the keys of a pack file. A language that has already
+    been loaded cannot be replaced, since patterns may have been compiled for it.
+
+    >>> register('xx', {'months': {'1': ['Primo']}, 'qualifiers': ['forse']})
+    >>> load('xx')['qualifiers']
+    ['forse']
+    """
+    pack = normalise(lang, pack)
+    if _packs.setdefault(lang, pack) is not pack:
+        raise ValueError("Language pack %s has already been loaded" % lang)
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,84 @@
+# Precisions of parsed dates
+DAY = 'day'
+MONTH = 'month'
+YEAR = 'year'
+CENTURY = 'century'
+
+class ParsedDate:
+    """
+    A parsed date or interval of dates with its bounds, precision, qualifiers and EDTF representation.
+    Bounds of open intervals are None. A date whose day or month does not exist is parsed with a lower precision, and
+    keeps the impossible date as invalid.
+
+    >>> ParsedDate('1940-04~', 1940, 4, None, 1940, 4, None, MONTH, approximate=True)
+    ParsedDate('1940-04~', start=(1940, 4, None), end=(1940, 4, None), precision='month', uncertain=False, approximate=True, rule=None)
+    """
+    __slots__ = ('edtf', 'startYear', 'startMonth', 'startDay', 'endYear', 'endMonth', 'endDay', 'precision', 'uncertain', 'approximate', 'rule', 'invalid')
+
+    def __init__(self, edtf, startYear=None, startMonth=None, startDay=None, endYear=None, endMonth=None, endDay=None, precision=YEAR, uncertain=False, approximate=False, rule=None, invalid=None):
+        self.edtf = edtf
+        self.startYear = startYear
+        self.startMonth = startMonth
+        self.startDay = startDay
+        self.endYear = endYear
+        self.endMonth = endMonth
+        self.endDay = endDay
+        self.precision = precision
+        self.uncertain = uncertain
+        self.approximate = approximate
+        self.rule = rule
+        self.invalid = invalid
+
+    def __repr__(self):
+        return "ParsedDate(%r, start=%r, end=%r, precision=%r, uncertain=%r, approximate=%r, rule=%r%s)" % (
+            self.edtf, (self.startYear, self.startMonth, self.startDay), (self.endYear, self.endMonth, self.endDay),
+            self.precision, self.uncertain, self.approximate, self.rule, '' if self.invalid is None else ', invalid=%r' % self.invalid)
+
+    def __eq__(self, other):
+        if not isinstance(other, ParsedDate):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+def number(text):
+    """
+    Returns the integer value of the digits in a string, or None if it contains none
+
+    >>> number("0747")
+    747
+
+    >>> number("1850?")
+    1850
+    """
+    digits = ''.join(c for c in text if c.isdigit())
+    return int(digits) if digits else None
+
+def date(edtf, year, month=None, day=None, uncertain=False, approximate=False, invalid=None):
+    """
+    Returns a parsed date that starts and ends on the same year, month or day, with the precision of its last given part
+
+    >>> date('1983-04-10', '1983', '04', '10').precision
+    'day'
+
+    >>> date('1861-02', '1861', '02', invalid='1861-02-30')
+    ParsedDate('1861-02', start=(1861, 2, None), end=(1861, 2, None), precision='month', uncertain=False, approximate=False, rule=None, invalid='1861-02-30')
+    """
+    precision = DAY if day is not None else MONTH if month is not None else YEAR
+    year = number(year)
+    month = number(month) if month is not None else None
+    day = number(day) if day is not None else None
+    return ParsedDate(edtf, year, month, day, year, month, day, precision, uncertain, approximate, invalid=invalid)
+
+def interval(edtf, startYear, endYear, precision=YEAR, uncertain=False):
+    """
+    Returns a parsed interval between two years, either of which may be None for an open interval
+
+    >>> interval('1850/1899', '1850', '1899')
+    ParsedDate('1850/1899', start=(1850, None, None), end=(1899, None, None), precision='year', uncertain=False, approximate=False, rule=None)
+    """
+    startYear = number(startYear) if startYear is not None else None
+    endYear = number(endYear) if endYear is not None else None
+    return ParsedDate(edtf, startYear, None, None, endYear, None, None, precision, uncertain)
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,146 @@
+"""
+Version hashes of the rules of a parser
+
+The version of a rule changes whenever the result of a date string that the rule interprets could change: when the
+tokenizer, the term index or the test pattern of the rule or of any rule tested before it changes, when the rules
+tested before it change, or when the parser function of the rule or any function, pattern or constant of the package that it
+uses changes. Stored results of a rule whose version is unchanged can be reused.
+"""
+import hashlib
+import inspect
+import os
+import types
+
+try:
+    import sariDateParser.lib.CompiledPatterns as CompiledPatterns
+    import sariDateParser.lib.Tokenizer as Tokenizer
+except ImportError:
+    try:
+        import lib.CompiledPatterns as CompiledPatterns
+        import lib.Tokenizer as Tokenizer
+    except ImportError:
+        import CompiledPatterns as CompiledPatterns
+        import Tokenizer as Tokenizer
+
+# Only functions and classes defined in the package are followed
+PACKAGEDIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def digest(*parts):
+    """
+    Returns a short hash of strings
+
+    >>> digest("a", "b") == digest("a", "b"), digest("a", "b") == digest("ab")
+    (True, False)
+    """
+    h = hashlib.sha1()
+    for part in parts:
+        encoded = part.encode('utf-8')
+        h.update(str(len(encoded)).encode('ascii') + b':' + encoded)
+    return h.hexdigest()[:16]
+
+def source(value):
+    """
+    Returns the source of a function, class or module, or the bytecode of a function whose source is not available
+    """
+    try:
+        return inspect.getsource(value)
+    except (OSError, TypeError):
+        code = getattr(value, '__code__', None)
+        return code.co_code.hex() if code is not None else repr(value)
+
+def inPackage(value):
+    module = inspect.getmodule(value)
+    path = getattr(module, '__file__', None)
+    return path is not None and os.path.abspath(path).startswith(PACKAGEDIRECTORY)
+
+def codeNames(code):
+    """
+    Returns the global and attribute names used by code and the functions defined in it
+    """
+    names = set(code.co_names)
+    for constant in code.co_consts:
+        if isinstance(constant, types.CodeType):
+            names |= codeNames(constant)
+    return names
+
+def describe(value):
+    """
+    Returns a string that changes whenever a value used by a parser changes, and is the same in every process: the
+    items of sets and dictionaries are sorted, since their order depends on hash randomization
+
+    >>> describe(CompiledPatterns.BRACKETS)
+    '\\\\[|\\\\]'
+    >>> describe({'b': frozenset(['02-29', '01-31']), 'a': None})
+    "{'a': None, 'b': {'01-31', '02-29'}}"
+    """
+    if isinstance(getattr(value, 'pattern', None), str):
+        return value.pattern
+    if isinstance(getattr(value, 'terms', None), dict):
+        return repr(sorted(value.terms.items()))
+    if isinstance(value, dict):
+        return '{' + ', '.join(sorted(describe(key) + ': ' + describe(item) for key, item in value.items())) + '}'
+    if isinstance(value, (set, frozenset)):
+        return '{' + ', '.join(sorted(describe(item) for item in value)) + '}'
+    if isinstance(value, (list, tuple)):
+        return ('[%s]' if isinstance(value, list) else '(%s)') % ', '.join(describe(item) for item in value)
+    return repr(value)
+
+def dependencies(function, patterns, seen):
+    """
+    Returns the source of a function followed by descriptions of the functions, classes, patterns and constants
+    of the package that it uses, directly or through other functions
+    """
+    parts = [source(function)]
+    names = codeNames(function.__code__)
+    namespaces = [vars(patterns), function.__globals__]
+    namespaces += [vars(value) for value in (function.__globals__.get(name) for name in sorted(names)) if isinstance(value, types.ModuleType) and inPackage(value)]
+    for name in sorted(names):
+        for namespace in namespaces:
+            if name not in namespace:
+                continue
+            value = namespace[name]
+            if isinstance(value, types.ModuleType):
+                continue
+            if isinstance(value, (types.FunctionType, type)):
+                if value in seen or not inPackage(value):
+                    continue
+                seen.add(value)
+                if isinstance(value, type):
+                    parts.append(source(value))
+                else:
+                    parts.extend(dependencies(value, patterns, seen))
+            elif not callable(value) and not name.startswith('_'):
+                # Private values, such as caches filled while parsing, are not part of the version
+                description = describe(value)
+                # Objects without a meaningful representation, such as locks and caches, are skipped
+                if ' at 0x' not in description:
+                    parts.append(description)
+    return parts
+
+def ruleVersions(patterns, rules, parsers, defaultCentury, maxLength=None):
+    """
+    Returns the version hash of each rule, tested in the given order, and of date strings that no rule interprets
+    under the key None. Whether a rule interprets a date string depends on which rules are tested before it, but
+    not on their order, and on the length of the longest date string that is parsed.
+
+    >>> patterns = CompiledPatterns.forLanguages()
+    >>> rules = CompiledPatterns.TESTORDER
+    >>> parsers = dict.fromkeys(rules, digest)
+    >>> versions = ruleVersions(patterns, rules, parsers, '19')
+    >>> swapped = ruleVersions(patterns, rules[:-3] + ['century', 'midCentury', 'singleYearRelaxed'], parsers, '19')
+    >>> [versions[rule] == swapped[rule] for rule in ['singleDate', 'centuryRange', 'midCentury', 'century', 'singleYearRelaxed', None]]
+    [True, True, False, False, True, True]
+    """
+    tokenized = digest(source(Tokenizer), describe(patterns.TOKEN), describe(patterns.INDEX), describe(CompiledPatterns.BRACKETS), repr(maxLength))
+    tested = []
+    versions = {}
+    for rule in rules:
+        tests = sorted(tested)
+        tested.append(rule + ' ' + patterns.TESTS[rule].pattern)
+        versions[rule] = digest(tokenized, defaultCentury, str(len(tests)), *tests + tested[-1:] + dependencies(parsers[rule], patterns, set()))
+    versions[None] = digest(tokenized, *sorted(tested))
+    return versions
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,130 @@
+"""
+Index of the month, century, half and cardinal terms of a combination of languages
+
+Terms are looked up regardless of case in a dictionary, and compiled through a trie into regular expressions
+that always prefer the longest term, so that for example "January" is not read as "Januar" followed by "y".
+An index is built once for each combination of languages and shared by the Tokenizer and the DateStringParsers.
+"""
+from collections import namedtuple
+
+try:
+    import sariDateParser.lib.constants as constants
+    import sariDateParser.lib.LanguagePacks as LanguagePacks
+except ImportError:
+    try:
+        import lib.constants as constants
+        import lib.LanguagePacks as LanguagePacks
+    except ImportError:
+        import constants as constants
+        import LanguagePacks as LanguagePacks
+
+# Kinds of terms
+MONTH = 'MONTH'
+ROMANMONTH = 'ROMANMONTH'
+CENTURY = 'CENTURY'
+HALF = 'HALF'
+CARDINAL = 'CARDINAL'
+
+Term = namedtuple('Term', ['kind', 'value', 'lang'])
+
+# Key of the term that ends at a node of the trie
+END = ''
+
+class TermIndex:
+    """
+    Case-folded dictionary and trie of terms. A term that was added first takes precedence over later terms
+    that only differ in case.
+
+    >>> index = TermIndex()
+    >>> index.add("Mar", MONTH, '3', 'en')
+    >>> index.add("March", MONTH, '3', 'en')
+    >>> index.add("Mai", MONTH, '5', 'de')
+    >>> index.lookup("MARCH")
+    Term(kind='MONTH', value='3', lang='en')
+    >>> index.pattern()
+    'ma(?:i|r(?:ch)?)'
+    """
+
+    def __init__(self):
+        self.terms = {}
+        self.trie = {}
+
+    def add(self, text, kind, value=None, lang=None):
+        key = text.lower()
+        if key in self.terms:
+            return
+        term = Term(kind, value, lang)
+        self.terms[key] = term
+        node = self.trie
+        for character in key:
+            node = node.setdefault(character, {})
+        node[END] = term
+
+    def lookup(self, text):
+        """
+        Returns the term that equals text regardless of case, or None
+        """
+        return self.terms.get(text.lower())
+
+    def pattern(self, kinds=None):
+        """
+        Returns a regular expression that matches the lowercased terms of the given kinds (all kinds if None),
+        preferring the longest term at any position. It is meant to be used case-insensitively.
+        """
+        import re
+
+        def compileNode(node):
+            alternatives = []
+            for character in sorted(node):
+                if character == END:
+                    continue
+                following = compileNode(node[character])
+                if following is not None:
+                    alternatives.append(re.escape(character) + following)
+            terminal = END in node and (kinds is None or node[END].kind in kinds)
+            if not alternatives:
+                return '' if terminal else None
+            if len(alternatives) == 1 and not terminal:
+                return alternatives[0]
+            group = '(?:' + '|'.join(alternatives) + ')'
+            return group + '?' if terminal else group
+        return compileNode(self.trie) or ''
+
+def buildIndex(languages):
+    """
+    Returns the index of the terms of the packs of the given languages and of the terms common to all languages.
+    Month terms that occur in several languages are taken from the first of them.
+
+    >>> index = buildIndex(['de', 'en', 'fr'])
+    >>> index.lookup("9br"), index.lookup("XI"), index.lookup("erste")
+    (Term(kind='MONTH', value='11', lang='fr'), Term(kind='ROMANMONTH', value='11', lang='roman'), Term(kind='CARDINAL', value=1, lang='de'))
+
+    >>> buildIndex(['en']).lookup("Juin") is None
+    True
+    """
+    packs = [(lang, LanguagePacks.load(lang)) for lang in languages]
+    index = TermIndex()
+    for lang, pack in packs:
+        for month, variations in pack['months'].items():
+            for variation in variations:
+                index.add(variation, MONTH, month, lang)
+    for month, variations in constants.ROMANMONTHTERMS.items():
+        for variation in variations:
+            index.add(variation, ROMANMONTH, month, 'roman')
+    for lang, pack in packs:
+        for term in pack['century']:
+            index.add(term, CENTURY, None, lang)
+        for term in pack['half']:
+            index.add(term, HALF, None, lang)
+    for cardinal, numerals in constants.CARDINALNUMERALS.items():
+        for numeral in numerals:
+            index.add(numeral, CARDINAL, cardinal)
+    for lang, pack in packs:
+        for cardinal, terms in pack['cardinals'].items():
+            for term in terms:
+                index.add(term, CARDINAL, cardinal, lang)
+    return index
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
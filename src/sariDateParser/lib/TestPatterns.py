@@ -1,25 +1,20 @@
-try:
-    import sariDateParser.lib.constants as constants
-except ImportError:
-    try:
-        import lib.constants as constants
-    except:
-        import constants as constants
+# Test patterns of the rules, matched against the pattern of a date string. They are templates in which
+# %(qualifiers)s is replaced by the uncertainty qualifiers and %(cardinals)s by the cardinal terms of the
+# languages that the patterns are compiled for.
+#
+# Patterns are searched in every position of a pattern, so optional parts are written such that no two of them can
+# match the same characters, such as (?:\s(?:zwischen\s?|\s)?|zwischen\s?)? for \s?(?:zwischen)?\s?, which would
+# otherwise be backtracked in every combination.
 
-import re
-
-cardinalTermsPattern = r'(' + '|'.join(constants.ALLCARDINALTERMS) + ')'
-cardinalTermsPattern = re.sub(r'\d','_', cardinalTermsPattern.replace('.','\.')) 
-
-afterYearWithQualifier = r'^(' + constants.UNCERTAINTYQUALIFIERS + ')?((?:nach|nicht vor)\s?(_{4})|_{4}-|_{4}-❓{1,2})\??$'
-beforeYearWithQualifier = r'^(' + constants.UNCERTAINTYQUALIFIERS + ')?((?:vor|nicht nach)\s?(_{4})|-_{4}|❓{1,2}-_{4})\??$'
+afterYearWithQualifier = r'^(%(qualifiers)s)?((?:nach|nicht vor)\s?(_{4})|_{4}-|_{4}-❓{1,2})\??$'
+beforeYearWithQualifier = r'^(%(qualifiers)s)?((?:vor|nicht nach)\s?(_{4})|-_{4}|❓{1,2}-_{4})\??$'
 century = r'_{1,2}(\s|\.)*¢'
 centuryRange = r'_{1,2}(\s|\.)*¢?(\/|-)_{1,2}(\s|\.)*¢'
 fullDateWithMonthInLangOrRoman = r'_{1,2}(t|\.|\s)*(🌕)(\.|\s)*(_{2,4})'
-midCentury = cardinalTermsPattern +'\s?½[A-zäöü|\s]*_{1,2}(\.|\s)*¢'
+midCentury = r'(%(cardinals)s)\s?½[A-zäöü|\s]*_{1,2}(\.|\s)*¢'
 monthAndYearWithMonthInLangOrRoman = r'🌕(\.|\s)*(_{2,4})'
 singleDate = r'(?:i\.e\.|den|le)?\s?(_{1,2}\._{1,2}\._{2,4})'
-singleYearWithQualifier = r'^(?:' + constants.UNCERTAINTYQUALIFIERS + '|A°|Ao|Ao\.|A°\.|Anno|anno|gezeichnet nach der Natur|i\.e\.)?\s?(____)\??$'
+singleYearWithQualifier = r'^(?:%(qualifiers)s|A°|Ao|Ao\.|A°\.|Anno|anno|gezeichnet nach der Natur|i\.e\.)?\s?(____)\??$'
 singleYearRelaxed = r'_{4}'
-yearRangeWithQualifier = r'(?:ca\.)?\s?(?:zwischen)?\s?(_{3,4}\??)\s?(?:-|und|ud|/)\s?(?:vor)?\s?(_{2,4}\??)'
-yearWithPlaceHolderAndQualifier = r'(([^_]|^)__--|([^_]|^)___-)'
\ No newline at end of file
+yearRangeWithQualifier = r'(?:ca\.)?(?:\s(?:zwischen\s?|\s)?|zwischen\s?)?(_{3,4}\??)\s?(?:-|und|ud|/)(?:\s(?:vor\s?|\s)?|vor\s?)?(_{2,4}\??)'
+yearWithPlaceHolderAndQualifier = r'(([^_]|^)__--|([^_]|^)___-)'
@@ -0,0 +1,126 @@
+from collections import namedtuple
+
+try:
+    import sariDateParser.lib.CompiledPatterns as CompiledPatterns
+except ImportError:
+    try:
+        import lib.CompiledPatterns as CompiledPatterns
+    except ImportError:
+        import CompiledPatterns as CompiledPatterns
+
+# Token types
+DIGITS = 'DIGITS'
+MONTH = 'MONTH'
+ROMANMONTH = 'ROMANMONTH'
+CENTURY = 'CENTURY'
+HALF = 'HALF'
+UNKNOWN = 'UNKNOWN'
+QUALIFIER = 'QUALIFIER'
+TEXT = 'TEXT'
+
+# Placeholders that represent a token type in a pattern
+PLACEHOLDERS = {
+    MONTH: '🌕',
+    ROMANMONTH: '🌕',
+    CENTURY: '¢',
+    HALF: '½',
+    UNKNOWN: '❓'
+}
+
+Token = namedtuple('Token', ['type', 'text', 'value'])
+
+def tokenize(dateString, patterns=None):
+    """
+    Splits a date string into a list of typed tokens in a single pass. Months carry their number as value,
+    digits their text, all other tokens None. Terms are those of the languages the patterns are compiled for,
+    by default those of the default languages.
+
+    >>> tokenize("ca. 2. Mai 1985")
+    [Token(type='QUALIFIER', text='ca.', value=None), Token(type='TEXT', text=' ', value=None), Token(type='DIGITS', text='2', value='2'), Token(type='TEXT', text='. ', value=None), Token(type='MONTH', text='Mai', value='5'), Token(type='TEXT', text=' ', value=None), Token(type='DIGITS', text='1985', value='1985')]
+
+    >>> [t.type for t in tokenize("[zweite Hälfte des 17. Jh.]")]
+    ['TEXT', 'HALF', 'TEXT', 'DIGITS', 'TEXT', 'CENTURY', 'TEXT']
+
+    >>> tokenize("7 9br 1950")[2]
+    Token(type='MONTH', text='9br', value='11')
+
+    >>> tokenize("5 IV 90")[2]
+    Token(type='ROMANMONTH', text='IV', value='4')
+
+    >>> tokenize("Juin 1890", CompiledPatterns.forLanguages(['de']))[0]
+    Token(type='TEXT', text='Juin ', value=None)
+    """
+    if patterns is None:
+        patterns = CompiledPatterns.forLanguages()
+    genericDate = CompiledPatterns.BRACKETS.sub('', dateString)
+    tokens = []
+    position = 0
+    for match in patterns.TOKEN.finditer(genericDate):
+        start = match.start()
+        if start > position:
+            tokens.append(Token(TEXT, genericDate[position:start], None))
+        tokenType = match.lastgroup
+        if tokenType == MONTH or tokenType == ROMANMONTH:
+            value = patterns.INDEX.lookup(match.group(tokenType)).value
+        elif tokenType == DIGITS:
+            value = match.group()
+        else:
+            value = None
+        tokens.append(Token(tokenType, match.group(), value))
+        position = match.end()
+    if position < len(genericDate):
+        tokens.append(Token(TEXT, genericDate[position:], None))
+    return tokens
+
+def toPattern(tokens):
+    """
+    Joins a list of tokens into a pattern string with placeholders for digits and date terms
+
+    >>> toPattern(tokenize("10 Mai 1985"))
+    '__ 🌕 ____'
+
+    >>> toPattern(tokenize(" ca. XX. Jahrhundert"))
+    'ca. ❓. ¢'
+    """
+    parts = []
+    for token in tokens:
+        if token.type == DIGITS:
+            parts.append('_' * len(token.text))
+        elif token.type in PLACEHOLDERS:
+            parts.append(PLACEHOLDERS[token.type])
+        else:
+            parts.append(token.text)
+    return ''.join(parts).strip()
+
+def firstMonth(tokens):
+    """
+    Returns the number of the first month expressed in a language term, or else in roman numerals
+
+    >>> firstMonth(tokenize("VII Juli 1893"))
+    '7'
+
+    >>> firstMonth(tokenize("6 X 1938"))
+    '10'
+
+    >>> firstMonth(tokenize("6.10.1938"))
+    """
+    romanMonth = None
+    for token in tokens:
+        if token.type == MONTH:
+            return token.value
+        if token.type == ROMANMONTH and romanMonth is None:
+            romanMonth = token.value
+    return romanMonth
+
+def digits(tokens):
+    """
+    Returns the text of all digit tokens
+
+    >>> digits(tokenize("18/19. Jahrhundert"))
+    ['18', '19']
+    """
+    return [token.text for token in tokens if token.type == DIGITS]
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
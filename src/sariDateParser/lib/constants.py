@@ -1,87 +1,100 @@
-
+# Century of years given with two digits, or a pivot year of four digits from which two-digit years count the next
+# hundred years, such as '1930' for 1930 to 2029
 DEFAULTCENTURY = '19'
-UNCERTAINTYQUALIFIERS = 'ca\.|ca|circa|um|vermutlich um|\?'
 
-MONTHTERMS = {
-    'de': {
-        '1': ["Januar", "Jan"],
-        '2': ["Februar", "Febr", "Feb"],
-        '3': ["März", "Maerz", "Merz", "Mrz"],
-        '4': ["April", "Apr", "Ap"],
-        '5': ["Mai", "Mei"],
-        '6': ["Juni", "Juny", "Jun"],
-        '7': ["Juli", "July", "Jul"],
-        '8': ["August", "Augst", "Aug"],
-        '9': ["September", "Sept", "Sep"],
-        '10': ["Oktober", "Okt"],
-        '11': ["November", "Nov"],
-        '12': ["Dezember", "Dez"],
-    },
-    'en': {
-        '1': ["January", "Jan"],
-        '2': ["February", "Feb"],
-        '3': ["March", "Mar"],
-        '4': ["April", "Apr"],
-        '5': ["May"],
-        '6': ["June", "Juny", "Jun"],
-        '7': ["July", "Jul"],
-        '8': ["August", "Aug", "Aust"],
-        '9': ["September", "Sep", "Sept"],
-        '10': ["October", "Oct"],
-        '11': ["November", "Nov"],
-        '12': ["December", "Dec"],
-    },
-    'fr': {
-        '1': ["Janvier", "Janv", "Jan"],
-        '2': ["Février", "Févr", "Fév"],
-        '3': ["Mars", "Mar"],
-        '4': ["Avrill", "Avril", "Avrl", "Avr"],
-        '5': ["Mai"],
-        '6': ["Juin"],
-        '7': ["Juillet", "Juil"],
-        '8': ["Août", "Aout", "Aoust", "Aost", "Aost", "Aou"],
-        '9': ["Septembre", "Septbr", "Sept", "Sep", "7bre", "7br"],
-        '10': ["Octobre", "octobr", "Octob", "Oct", "8bre", "8br"],
-        '11': ["Novembre", "Novbr", "Nov", "9bre", "9br"],
-        '12': ["Décembre", "Decbr", "Dec", "Xbre", "Xbr"],
-    },
-    'roman': {
-        '8': ["VIII"],
-        '7': ["VII"],
-        '12': ["XII"],
-        '3': ["III"],
-        '11': ["XI"],
-        '9': ["IX"],
-        '2': ["II"],
-        '4': ["IV"],
-        '6': ["VI"],
-        '10': ["X", "Xbr"],
-        '5': ["V"],
-        '1': ["I"],
-    }
-}
+# First year whose leap years follow the Gregorian calendar, before it every fourth year is a leap year as in the
+# Julian calendar. Catholic regions adopted the Gregorian calendar from 1582 on, but the last territories of
+# Switzerland only in 1812, so that Julian leap days are accepted until then.
+GREGORIANYEAR = 1812
 
-CENTURYTERMS = {
-    'de': ["Jahrhundert", "Jahrundert", "Jht", "Jh"]
-}
+# Languages whose packs are used by default, in order of preference for terms that occur in several of them.
+# The terms of each language are in its pack in the languages directory.
+DEFAULTLANGUAGES = ['de', 'en', 'fr']
 
-BCETERMS = {
-    'de': ["v.Chr"]
+# Terms that are the same in all languages
+ROMANMONTHTERMS = {
+    '8': ["VIII"],
+    '7': ["VII"],
+    '12': ["XII"],
+    '3': ["III"],
+    '11': ["XI"],
+    '9': ["IX"],
+    '2': ["II"],
+    '4': ["IV"],
+    '6': ["VI"],
+    '10': ["X", "Xbr"],
+    '5': ["V"],
+    '1': ["I"],
 }
 
-CARDINALTERMS = {
-    1: ["1.", "erste"],
-    2: ["2.", "zweite"],
+CARDINALNUMERALS = {
+    1: ["1."],
+    2: ["2."],
 }
 
-MIDTERMS = {
-    'de': ["Hälfte", "H."]
-}
+QUALIFIERSIGNS = ["?"]
+
+# Length of the longest date string that is parsed. The time to parse a date string grows with its length, and
+# longer strings are descriptions rather than dates, in which dates can be found with findDates.
+MAXLENGTH = 500
 
-ALLMONTHTERMS = [item for sublist in [month for langMonths in [list(d.values()) for d in [MONTHTERMS[lang] for lang in MONTHTERMS]] for month in langMonths] for item in sublist]
-ALLMONTHLANGUAGETERMS = [item for sublist in [month for langMonths in [list(d.values()) for d in [MONTHTERMS[lang] for lang in MONTHTERMS if lang != 'roman']] for month in langMonths] for item in sublist]
-ALLBCETERMS = [d for l in [BCETERMS[d] for d in BCETERMS] for d in l]
-ALLCENTURYTERMS = [d for l in [CENTURYTERMS[d] for d in CENTURYTERMS] for d in l]
-ALLCARDINALTERMS = [d for l in [CARDINALTERMS[d] for d in CARDINALTERMS] for d in l]
-ALLMIDTERMS = [d for l in [MIDTERMS[d] for d in MIDTERMS] for d in l]
+# Number of combinations of languages whose compiled patterns and parsers are kept, besides those of the default
+# languages. The oldest combination is dropped when another one is compiled, so that callers that select many
+# combinations do not grow the memory of the process without bound.
+MAXLANGUAGECOMBINATIONS = 32
+
+# Names of the terms of the default languages as they were before they moved to language packs. They are built on
+# first access and then kept in the globals of the module, so that later accesses do not build them again.
+LEGACYNAMES = ('MONTHTERMS', 'CENTURYTERMS', 'BCETERMS', 'CARDINALTERMS', 'MIDTERMS', 'UNCERTAINTYQUALIFIERS',
+               'ALLMONTHTERMS', 'ALLMONTHLANGUAGETERMS', 'ALLBCETERMS', 'ALLCENTURYTERMS', 'ALLCARDINALTERMS', 'ALLMIDTERMS')
+
+def __getattr__(name):
+    """
+    Returns the terms of the default languages under a legacy name
+
+    >>> import sys
+    >>> constants = sys.modules[__name__]
+    >>> constants.MONTHTERMS['roman']['10'], constants.ALLMIDTERMS is constants.ALLMIDTERMS
+    (['X', 'Xbr'], True)
+    """
+    if name not in LEGACYNAMES:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    try:
+        import sariDateParser.lib.LanguagePacks as LanguagePacks
+    except ImportError:
+        try:
+            import lib.LanguagePacks as LanguagePacks
+        except ImportError:
+            import LanguagePacks as LanguagePacks
+    import re
+
+    packs = {lang: LanguagePacks.load(lang) for lang in DEFAULTLANGUAGES}
+    def terms(key):
+        return {lang: pack[key] for lang, pack in packs.items() if pack[key]}
+    MONTHTERMS = dict({lang: pack['months'] for lang, pack in packs.items()}, roman=ROMANMONTHTERMS)
+    CENTURYTERMS = terms('century')
+    BCETERMS = terms('bce')
+    MIDTERMS = terms('half')
+    CARDINALTERMS = {cardinal: numerals + [term for pack in packs.values() for term in pack['cardinals'].get(cardinal, [])] for cardinal, numerals in CARDINALNUMERALS.items()}
+    qualifiers = [q for pack in packs.values() for q in pack['qualifiers']]
+    UNCERTAINTYQUALIFIERS = '|'.join(re.escape(q) for q in list(dict.fromkeys(qualifiers)) + QUALIFIERSIGNS)
+    legacy = {
+        'MONTHTERMS': MONTHTERMS,
+        'CENTURYTERMS': CENTURYTERMS,
+        'BCETERMS': BCETERMS,
+        'CARDINALTERMS': CARDINALTERMS,
+        'MIDTERMS': MIDTERMS,
+        'UNCERTAINTYQUALIFIERS': UNCERTAINTYQUALIFIERS,
+        'ALLMONTHTERMS': [term for months in MONTHTERMS.values() for terms in months.values() for term in terms],
+        'ALLMONTHLANGUAGETERMS': [term for lang, months in MONTHTERMS.items() if lang != 'roman' for terms in months.values() for term in terms],
+        'ALLBCETERMS': [term for terms in BCETERMS.values() for term in terms],
+        'ALLCENTURYTERMS': [term for terms in CENTURYTERMS.values() for term in terms],
+        'ALLCARDINALTERMS': [term for terms in CARDINALTERMS.values() for term in terms],
+        'ALLMIDTERMS': [term for terms in MIDTERMS.values() for term in terms]
+    }
+    globals().update(legacy)
+    return legacy[name]
 
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
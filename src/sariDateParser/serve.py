@@ -0,0 +1,260 @@
+"""
+HTTP service that parses batches of date strings sent as JSON
+
+Run it with `python -m sariDateParser.serve` and post a list of date strings, or an object with the date strings
+under "dates" and optionally the codes of their languages under "languages", to /parse:
+
+    curl -d '["um 1900", "19. Jh."]' http://localhost:8080/parse
+    {"results": ["1900?", "18XX"]}
+
+Batches are split into chunks that are parsed in a pool of worker processes, so that the event loop keeps accepting
+requests. Throughput and latency are reported at /stats, and /health answers as soon as the service is up.
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from time import monotonic, perf_counter
+
+try:
+    from sariDateParser.dateParser import enableCache, parseMany, prewarm, warmup
+    from sariDateParser.lib import LanguagePacks
+    from sariDateParser.lib.Instrumentation import Histogram
+except ImportError:
+    from dateParser import enableCache, parseMany, prewarm, warmup
+    from lib import LanguagePacks
+    from lib.Instrumentation import Histogram
+
+# Largest number of date strings accepted in one request
+MAXBATCH = 10000
+# Largest request body in bytes
+MAXBODY = 4 * 1024 * 1024
+# Number of date strings handed to a worker at once
+CHUNKSIZE = 1000
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def initWorker(languages, prewarmFile=None):
+    """
+    Compiles the patterns and enables the result cache in a worker process, filling it from a prewarm file if given
+    """
+    enableCache()
+    warmup(languages)
+    if prewarmFile:
+        prewarm(prewarmFile, languages)
+
+def readBatch(body, maxBatch=MAXBATCH):
+    """
+    Returns the date strings and languages of the body of a request. Languages are deduplicated and sorted, so that
+    each set of languages is compiled only once in a worker, and unknown languages are rejected before any pattern
+    is compiled for them.
+
+    >>> readBatch(b'["um 1900", "19. Jh."]')
+    (['um 1900', '19. Jh.'], None)
+
+    >>> readBatch('{"dates": ["2 Juin 1890"], "languages": ["fr", "de", "fr"]}'.encode())
+    (['2 Juin 1890'], ['de', 'fr'])
+
+    >>> try:
+    ...     readBatch(b'{"dates": ["2 Juin 1890"], "languages": ["fr", "xx"]}')
+    ... except RequestError as e:
+    ...     print(e.status, e)
+    400 Unknown languages: xx
+
+    >>> try:
+    ...     readBatch(b'["um 1900", "19. Jh."]', maxBatch=1)
+    ... except RequestError as e:
+    ...     print(e.status, e)
+    413 Batches are limited to 1 dates
+    """
+    try:
+        batch = json.loads(body.decode('utf-8'))
+    except ValueError:
+        raise RequestError(400, "Body is not valid JSON")
+    languages = None
+    if isinstance(batch, dict):
+        languages = batch.get('languages')
+        batch = batch.get('dates')
+        if languages is not None:
+            if not (isinstance(languages, list) and languages and all(isinstance(lang, str) for lang in languages)):
+                raise RequestError(400, "Languages must be a list of language codes")
+            languages = sorted(set(languages))
+            available = LanguagePacks.available()
+            unknown = [lang for lang in languages if lang not in available]
+            if unknown:
+                raise RequestError(400, "Unknown languages: %s" % ', '.join(unknown))
+    if not isinstance(batch, list):
+        raise RequestError(400, "Expected a list of dates or an object with a list of dates under \"dates\"")
+    if len(batch) > maxBatch:
+        raise RequestError(413, "Batches are limited to %d dates" % maxBatch)
+    if not all(dateString is None or isinstance(dateString, str) for dateString in batch):
+        raise RequestError(400, "Dates must be strings or null")
+    return batch, languages
+
+def parseBatch(dateStrings, languages=None):
+    """
+    Parses the date strings of a chunk in a worker, leaving null values unparsed
+
+    >>> parseBatch(["um 1900", None, ""])
+    ['1900?', None, None]
+    """
+    return parseMany([dateString or '' for dateString in dateStrings], languages)
+
+class Stats:
+    """
+    Counts requests and parsed date strings, and the latency of requests to /parse
+    """
+
+    def __init__(self):
+        self.started = monotonic()
+        self.requests = 0
+        self.errors = 0
+        self.dates = 0
+        self.parseTime = 0.0
+        self.latency = Histogram()
+
+    def info(self):
+        uptime = monotonic() - self.started
+        return {
+            'uptimeS': uptime,
+            'requests': self.requests,
+            'errors': self.errors,
+            'dates': self.dates,
+            'datesPerS': self.dates / uptime if uptime else None,
+            'datesPerBusyS': self.dates / self.parseTime if self.parseTime else None,
+            'latency': self.latency.info()
+        }
+
+class Server:
+    """
+    Answers HTTP/1.1 requests on a connection until the client closes it or asks to close it
+    """
+
+    def __init__(self, executor, maxBatch=MAXBATCH, chunkSize=CHUNKSIZE):
+        self.executor = executor
+        self.maxBatch = maxBatch
+        self.chunkSize = chunkSize
+        self.stats = Stats()
+
+    async def parse(self, body):
+        dateStrings, languages = readBatch(body, self.maxBatch)
+        loop = asyncio.get_running_loop()
+        start = perf_counter()
+        chunks = [dateStrings[i:i + self.chunkSize] for i in range(0, len(dateStrings), self.chunkSize)]
+        try:
+            parsed = await asyncio.gather(*[loop.run_in_executor(self.executor, parseBatch, chunk, languages) for chunk in chunks])
+        except ValueError as e:
+            raise RequestError(400, str(e))
+        except Exception as e:
+            raise RequestError(500, "Parsing failed: %r" % e)
+        elapsed = perf_counter() - start
+        self.stats.dates += len(dateStrings)
+        self.stats.parseTime += elapsed
+        self.stats.latency.add(elapsed)
+        return {'results': [edtf for results in parsed for edtf in results]}
+
+    async def respond(self, method, path, body):
+        if path == '/parse':
+            if method != 'POST':
+                raise RequestError(405, "Use POST to parse dates")
+            return await self.parse(body)
+        if method != 'GET':
+            if path in ('/stats', '/health'):
+                raise RequestError(405, "Use GET for %s" % path)
+            raise RequestError(404, "Not found: %s" % path)
+        if path == '/stats':
+            return self.stats.info()
+        if path == '/health':
+            return {'status': 'ok'}
+        raise RequestError(404, "Not found: %s" % path)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                requestLine = await reader.readline()
+                if not requestLine.strip():
+                    break
+                try:
+                    method, target, version = requestLine.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                keepAlive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+
+                self.stats.requests += 1
+                try:
+                    length = int(headers.get('content-length', 0))
+                    if length > MAXBODY:
+                        keepAlive = False
+                        raise RequestError(413, "Bodies are limited to %d bytes" % MAXBODY)
+                    body = await reader.readexactly(length) if length > 0 else b''
+                    status, response = 200, await self.respond(method, target.split('?', 1)[0], body)
+                except RequestError as e:
+                    self.stats.errors += 1
+                    status, response = e.status, {'error': str(e)}
+
+                content = json.dumps(response, ensure_ascii=False).encode('utf-8')
+                writer.write(('HTTP/1.1 %d %s\r\nContent-Type: application/json; charset=utf-8\r\nContent-Length: %d\r\nConnection: %s\r\n\r\n' % (
+                    status, REASONS[status], len(content), 'keep-alive' if keepAlive else 'close')).encode('latin-1') + content)
+                await writer.drain()
+                if not keepAlive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(host, port, executor, maxBatch=MAXBATCH, chunkSize=CHUNKSIZE):
+    server = Server(executor, maxBatch, chunkSize)
+    listener = await asyncio.start_server(server.handle, host, port)
+    for socket in listener.sockets:
+        address = socket.getsockname()
+        print("Serving on http://%s:%d" % (address[0], address[1]), file=sys.stderr, flush=True)
+    async with listener:
+        await listener.serve_forever()
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='python -m sariDateParser.serve', description='Serve a JSON endpoint that parses batches of dates into EDTF')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('-p', '--port', type=int, default=8080, help='Port to listen on, or 0 for any free port (default: 8080)')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1, help='Number of worker processes, or 0 to parse in a thread of the server process (default: number of CPUs)')
+    parser.add_argument('-l', '--languages', help='Comma-separated codes of the languages compiled at startup, in order of preference (default: the default languages)')
+    parser.add_argument('--prewarm', help='Prewarm file written by sari-date-shapes, whose shapes are loaded into the caches of each worker at startup')
+    parser.add_argument('--max-batch', type=int, default=MAXBATCH, help='Largest number of dates accepted in one request (default: %d)' % MAXBATCH)
+    parser.add_argument('--chunk-size', type=int, default=CHUNKSIZE, help='Number of dates handed to a worker at once (default: %d)' % CHUNKSIZE)
+    options = parser.parse_args(args)
+
+    languages = options.languages.split(',') if options.languages else None
+    try:
+        initWorker(languages, options.prewarm)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if options.workers > 0:
+        executor = ProcessPoolExecutor(options.workers, initializer=initWorker, initargs=(languages, options.prewarm))
+    else:
+        executor = ThreadPoolExecutor(1)
+    # Stop like on an interrupt when terminated, so that the worker processes are shut down as well
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        asyncio.run(serve(options.host, options.port, executor, options.max_batch, options.chunk_size))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown()
+
+if __name__ == '__main__':
+    main()
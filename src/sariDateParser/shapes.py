@@ -0,0 +1,127 @@
+"""
+Report of the shapes of the date strings of a corpus
+
+Date strings are grouped by the pattern that extractPattern reduces them to, such as `__ 🌕 ____`. For each shape,
+the report gives its frequency, the rule that interprets it and how many of its date strings are not parsed. The most
+frequent shapes can be exported as a prewarm file that services load at startup with dateParser.prewarm.
+
+    sari-date-shapes export.csv --column date --top 20 --prewarm prewarm.json
+
+>>> shapes = shapeReport(["um 1900", "um 1850", "19. Jh.", "um 1900", "o.J."])
+>>> print(formatReport(shapes))
+ count  share  cumul.   None  rule                                pattern / examples
+     3  60.0%   60.0%   0.0%  singleYearWithQualifier             'um ____'  'um 1900', 'um 1850'
+     1  20.0%   80.0%   0.0%  century                             '__. ¢.'  '19. Jh.'
+     1  20.0%  100.0% 100.0%  None                                'o.J.'  'o.J.'
+"""
+import argparse
+import json
+import sys
+from collections import Counter, namedtuple
+
+try:
+    from sariDateParser.dateParser import defaultParser
+    from sariDateParser.lib.constants import DEFAULTLANGUAGES
+except ImportError:
+    from dateParser import defaultParser
+    from lib.constants import DEFAULTLANGUAGES
+
+# Number of most frequent date strings kept as examples of each shape
+EXAMPLES = 3
+
+# Number of shapes exported to a prewarm file by default, which fit into the rule cache
+PREWARMSHAPES = 1000
+
+Shape = namedtuple('Shape', ['pattern', 'count', 'unparsed', 'rule', 'examples'])
+
+def shapeReport(dateStrings, languages=None, examples=EXAMPLES):
+    """
+    Groups date strings by their pattern and returns the shapes from the most to the least frequent, with the number
+    of date strings of each, how many of them are not parsed, the rule that interprets it and the most frequent
+    date strings as examples. Each distinct date string is only parsed once.
+    """
+    parser = defaultParser(languages)
+    shapes = {}
+    for dateString, count in Counter(dateStrings).most_common():
+        pattern = parser.extractPattern(dateString)
+        shape = shapes.get(pattern)
+        if shape is None:
+            rule = parser.matchRule(pattern)
+            shape = shapes[pattern] = [0, 0, rule[0] if rule else None, []]
+        shape[0] += count
+        if parser.parse(dateString) is None:
+            shape[1] += count
+        if len(shape[3]) < examples:
+            shape[3].append(dateString)
+    return sorted((Shape(pattern, count, unparsed, rule, examples) for pattern, (count, unparsed, rule, examples) in shapes.items()), key=lambda shape: -shape.count)
+
+def formatReport(shapes, top=None):
+    """
+    Returns a table of the most frequent shapes with their count, their share and cumulative share of all date
+    strings, the share of date strings that are not parsed, their rule, pattern and examples
+    """
+    total = sum(shape.count for shape in shapes) or 1
+    lines = ["%6s %6s %7s %6s  %-35s %s" % ('count', 'share', 'cumul.', 'None', 'rule', 'pattern / examples')]
+    cumulative = 0
+    for shape in shapes[:top]:
+        cumulative += shape.count
+        lines.append("%6d %5.1f%% %6.1f%% %5.1f%%  %-35s %r  %s" % (
+            shape.count, 100 * shape.count / total, 100 * cumulative / total, 100 * shape.unparsed / shape.count,
+            shape.rule, shape.pattern, ', '.join(repr(example) for example in shape.examples)))
+    return '\n'.join(lines)
+
+def writePrewarm(path, shapes, languages=None, size=PREWARMSHAPES):
+    """
+    Writes the patterns of the most frequent shapes and their most frequent example to a prewarm file
+    """
+    prewarmed = {
+        'languages': languages,
+        'shapes': [{'pattern': shape.pattern, 'example': shape.examples[0], 'count': shape.count, 'rule': shape.rule} for shape in shapes[:size]]
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(prewarmed, f, ensure_ascii=False, indent=1)
+
+def readDateStrings(path, column=None, fileFormat=None):
+    """
+    Returns the date strings of a file: its lines, or the values of a column of a CSV, TSV or JSONL file
+    """
+    try:
+        from sariDateParser import bulk, cli
+    except ImportError:
+        import bulk, cli
+    fileFormat = fileFormat or cli.guessFormat(path)
+    if column is not None and fileFormat == 'jsonl':
+        with open(path, 'r', encoding='utf-8') as f:
+            return [cli.dateValue(record, column) for record in cli.readRecords(f, fileFormat)[1]]
+    return bulk.readValues(path, column, cli.DELIMITERS.get(fileFormat, ','))
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='sari-date-shapes', description='Report the shapes of the dates in a file and export the most frequent ones to a prewarm file')
+    parser.add_argument('input', help='Input file with one date per line, or a CSV, TSV or JSONL file with --column')
+    parser.add_argument('-c', '--column', help='Name of the column or key that contains the dates')
+    parser.add_argument('-f', '--format', choices=['csv', 'tsv', 'jsonl'], help='Format of the input (default: guessed from the input file extension)')
+    parser.add_argument('-l', '--languages', help='Comma-separated codes of the languages of the dates, in order of preference (default: %s)' % ','.join(DEFAULTLANGUAGES))
+    parser.add_argument('--top', type=int, default=20, help='Number of shapes in the report (default: 20)')
+    parser.add_argument('--json', help='Write all shapes as JSON to this file')
+    parser.add_argument('--prewarm', help='Write the most frequent shapes to this prewarm file')
+    parser.add_argument('--prewarm-shapes', type=int, default=PREWARMSHAPES, help='Number of shapes in the prewarm file (default: %d)' % PREWARMSHAPES)
+    options = parser.parse_args(args)
+
+    languages = options.languages.split(',') if options.languages else None
+    try:
+        shapes = shapeReport(readDateStrings(options.input, options.column, options.format), languages)
+    except ValueError as e:
+        parser.error(str(e))
+    total = sum(shape.count for shape in shapes)
+    unparsed = sum(shape.unparsed for shape in shapes)
+    print("%d dates in %d shapes, %d not parsed" % (total, len(shapes), unparsed))
+    print(formatReport(shapes, options.top))
+    if options.json:
+        with open(options.json, 'w', encoding='utf-8') as f:
+            json.dump([shape._asdict() for shape in shapes], f, ensure_ascii=False, indent=1)
+    if options.prewarm:
+        writePrewarm(options.prewarm, shapes, languages, options.prewarm_shapes)
+        sys.stderr.write("Wrote %d shapes covering %d of %d dates to %s\n" % (min(len(shapes), options.prewarm_shapes), sum(shape.count for shape in shapes[:options.prewarm_shapes]), total, options.prewarm))
+
+if __name__ == '__main__':
+    main()
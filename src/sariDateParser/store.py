@@ -0,0 +1,151 @@
+"""
+Persistent store of parsed date strings for re-parsing large collections incrementally
+
+Each distinct date string is stored with its EDTF date, the rule that interpreted it and the version of that rule.
+When a release changes some rules, only date strings whose rule version changed are parsed again, and the ones whose
+EDTF date changed are reported as diffs against the stored result.
+
+>>> import os, tempfile
+>>> path = os.path.join(tempfile.mkdtemp(), 'dates.sqlite')
+>>> with ResultStore(path) as store:
+...     store.parseMany(["um 1900", "19. Jh.", "um 1900", "o.J."])
+['1900?', '18XX', '1900?', None]
+>>> with ResultStore(path) as store:
+...     store.parseMany(["um 1900", "1751"])
+...     store.report()
+['1900?', '1751']
+Report(added=1, reused=1, reparsed=0, diffs=[])
+
+When rules change, their stored results are parsed again. Here the century of two-digit years changes, which is
+given to all rules:
+
+>>> with ResultStore(path) as store:
+...     store.parseMany(["Aug 95"])
+['1995-08']
+>>> with ResultStore(path, DateParser(defaultCentury='18')) as store:
+...     store.refresh()
+Report(added=0, reused=0, reparsed=4, diffs=[Diff(dateString='Aug 95', previous='1995-08', current='1895-08', previousRule='monthAndYearWithMonthInLangOrRoman', currentRule='monthAndYearWithMonthInLangOrRoman')])
+"""
+import sqlite3
+from collections import namedtuple
+
+try:
+    from sariDateParser.dateParser import DateParser, defaultParser
+except ImportError:
+    from dateParser import DateParser, defaultParser
+
+# Largest number of date strings looked up in one query, below the limit of SQLite on query parameters
+LOOKUPSIZE = 500
+
+Diff = namedtuple('Diff', ['dateString', 'previous', 'current', 'previousRule', 'currentRule'])
+Report = namedtuple('Report', ['added', 'reused', 'reparsed', 'diffs'])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    dateString TEXT PRIMARY KEY,
+    edtf TEXT,
+    rule TEXT,
+    version TEXT NOT NULL
+)
+"""
+
+class ResultStore:
+    """
+    SQLite store of the results of a parser, the default parser of the default languages if None. Counts of added,
+    reused and reparsed date strings and the diffs of reparsed ones are collected until the store is closed.
+    """
+
+    def __init__(self, path, parser=None):
+        self.parser = parser if parser is not None else defaultParser()
+        self.versions = self.parser.ruleVersions()
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(SCHEMA)
+        self.added = 0
+        self.reused = 0
+        self.reparsed = 0
+        self.diffs = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def report(self):
+        return Report(self.added, self.reused, self.reparsed, list(self.diffs))
+
+    def isCurrent(self, rule, version):
+        return self.versions.get(rule) == version
+
+    def lookup(self, dateStrings):
+        """
+        Returns the stored EDTF date, rule and version of each of the date strings that are in the store
+        """
+        stored = {}
+        for i in range(0, len(dateStrings), LOOKUPSIZE):
+            chunk = dateStrings[i:i + LOOKUPSIZE]
+            query = "SELECT dateString, edtf, rule, version FROM results WHERE dateString IN (%s)" % ','.join('?' * len(chunk))
+            for dateString, edtf, rule, version in self.connection.execute(query, chunk):
+                stored[dateString] = (edtf, rule, version)
+        return stored
+
+    def reparse(self, dateString, previous=None):
+        """
+        Parses a date string and returns the row to store, recording a diff if it was stored with another EDTF date
+        """
+        edtf, rule = self.parser.parseWithRule(dateString)
+        if previous is None:
+            self.added += 1
+        else:
+            self.reparsed += 1
+            if previous[0] != edtf:
+                self.diffs.append(Diff(dateString, previous[0], edtf, previous[1], rule))
+        return dateString, edtf, rule, self.versions[rule]
+
+    def parseMany(self, dateStrings):
+        """
+        Returns the EDTF dates of date strings in input order, parsing only those that are not stored with the
+        current version of their rule
+        """
+        dateStrings = list(dateStrings)
+        unique = list(dict.fromkeys(dateStrings))
+        stored = self.lookup(unique)
+        results = {}
+        rows = []
+        for dateString in unique:
+            previous = stored.get(dateString)
+            if previous is not None and self.isCurrent(previous[1], previous[2]):
+                self.reused += 1
+                results[dateString] = previous[0]
+                continue
+            row = self.reparse(dateString, previous)
+            rows.append(row)
+            results[dateString] = row[1]
+        self.save(rows)
+        return [results[dateString] for dateString in dateStrings]
+
+    def refresh(self):
+        """
+        Parses all stored date strings whose rule changed again, without the collection they came from, and returns
+        the report
+        """
+        stale = [(rule, version) for rule, version in self.connection.execute("SELECT DISTINCT rule, version FROM results") if not self.isCurrent(rule, version)]
+        for rule, version in stale:
+            # Reparsed date strings are stored with the current version, so each query returns the next chunk
+            while True:
+                chunk = self.connection.execute("SELECT dateString, edtf, rule FROM results WHERE rule IS ? AND version = ? LIMIT ?", (rule, version, LOOKUPSIZE)).fetchall()
+                if not chunk:
+                    break
+                self.save([self.reparse(dateString, (edtf, previousRule)) for dateString, edtf, previousRule in chunk])
+        return self.report()
+
+    def save(self, rows):
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO results (dateString, edtf, rule, version) VALUES (?, ?, ?, ?)", rows)
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,146 @@
+import argparse
+import csv
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+from corpus import generateCorpus, readExamples
+
+from sariDateParser.bulk import parseFile, readValues
+from sariDateParser.dateParser import cleanDateString, clearCache, disableCache, enableCache, extractPattern, findDates, interpret, matchRule, parse, parseMany
+from sariDateParser.lib import CompiledPatterns, DateStringParsers, Tokenizer
+
+srcDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+def timePerCall(function, arguments, repeat):
+    """
+    Returns the best time in microseconds per call of function over all arguments
+    """
+    timer = timeit.Timer(lambda: [function(*a) for a in arguments])
+    best = min(timer.repeat(repeat=repeat, number=1))
+    return best / len(arguments) * 1e6
+
+def throughput(function, argument, repeat):
+    """
+    Returns the best number of items per second processed by a single call of function over argument
+    """
+    timer = timeit.Timer(lambda: function(argument))
+    best = min(timer.repeat(repeat=repeat, number=1))
+    return len(argument) / best
+
+def importTime(module, repeat):
+    """
+    Returns the best time in milliseconds to import a module in a new interpreter, minus the interpreter start-up time
+    """
+    def startUp(code):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', code], check=True, env=dict(os.environ, PYTHONPATH=srcDir))
+            times.append(time.perf_counter() - start)
+        return min(times)
+    return (startUp('import ' + module) - startUp('pass')) * 1e3
+
+def run(rows, repeat, seed, batchRepeat):
+    examples = readExamples()
+    corpus = list(generateCorpus(examples, rows, seed))
+    patterns = [extractPattern(dateString) for dateString in corpus]
+    results = {}
+
+    # Stages of parse
+    for name, function, arguments in [
+        ('extractPattern', extractPattern, [(d,) for d in corpus]),
+        ('interpret', interpret, list(zip(corpus, patterns))),
+        ('parse', parse, [(d,) for d in corpus])
+    ]:
+        results[name] = {'usPerCall': timePerCall(function, arguments, repeat), 'calls': len(arguments)}
+
+    # Parser functions, each over the date strings of the corpus that it interprets
+    parserArguments = {test: [] for test in CompiledPatterns.TESTORDER}
+    for dateString, pattern in zip(corpus, patterns):
+        rule = matchRule(pattern)
+        if rule:
+            parserArguments[rule[0]].append((cleanDateString(dateString), Tokenizer.tokenize(dateString)))
+    for test, arguments in parserArguments.items():
+        if arguments:
+            results['DateStringParsers.' + test] = {'usPerCall': timePerCall(getattr(DateStringParsers, test), arguments, repeat), 'calls': len(arguments)}
+
+    # Batches of recurring date strings
+    batch = examples * batchRepeat
+    for name, function in [
+        ('parse loop', lambda dateStrings: [parse(d) for d in dateStrings]),
+        ('parse loop, cached', lambda dateStrings: clearCache() or [parse(d) for d in dateStrings]),
+        ('parseMany', parseMany)
+    ]:
+        if 'cached' in name:
+            enableCache()
+        results['batch: ' + name] = {'itemsPerSecond': throughput(function, batch, repeat), 'items': len(batch), 'unique': len(set(batch))}
+        disableCache()
+
+    # Notes of free text with two dates of the corpus each
+    filler = "Brief des Sammlers an seinen Bruder, später im Archiv der Familie aufbewahrt, datiert"
+    notes = ["%s %s und %s %s." % (filler, corpus[i], filler, corpus[i + 1]) for i in range(0, len(corpus) - 1, 2)]
+    results['text: findDates'] = {'itemsPerSecond': throughput(lambda notes: [findDates(note) for note in notes], notes, repeat), 'items': len(notes), 'unique': len(set(notes))}
+
+    # Reading and parsing the date column of a CSV export of the corpus
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'export.csv')
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['id', 'date'])
+            writer.writerows(enumerate(corpus))
+        def readWithDictReader(path):
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                return [record['date'] for record in csv.DictReader(f)]
+        for name, function in [
+            ('csv.DictReader', readWithDictReader),
+            ('bulk.readValues', lambda path: readValues(path, 'date')),
+            ('csv.DictReader and parseMany', lambda path: parseMany(readWithDictReader(path))),
+            ('bulk.parseFile', lambda path: [edtf for chunk in parseFile(path, 'date') for edtf in chunk])
+        ]:
+            timer = timeit.Timer(lambda: function(path))
+            results['file: ' + name] = {'itemsPerSecond': len(corpus) / min(timer.repeat(repeat=repeat, number=1)), 'items': len(corpus), 'unique': len(set(corpus))}
+
+    # Cold imports
+    for module in ['sariDateParser.dateParser']:
+        results['import ' + module] = {'ms': importTime(module, repeat)}
+
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'rows': rows,
+        'seed': seed,
+        'repeat': repeat,
+        'results': results
+    }
+
+def printResults(benchmark):
+    print("Python %s on %s, %d synthetic rows, best of %d runs" % (benchmark['python'], benchmark['platform'], benchmark['rows'], benchmark['repeat']))
+    for name, result in benchmark['results'].items():
+        if 'usPerCall' in result:
+            print("%-50s %10.2f µs/call (%d calls)" % (name, result['usPerCall'], result['calls']))
+        elif 'itemsPerSecond' in result:
+            print("%-50s %10d items/s (%d unique of %d)" % (name, result['itemsPerSecond'], result['unique'], result['items']))
+        else:
+            print("%-50s %10.2f ms" % (name, result['ms']))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the date parser over a synthetic corpus generated from the examples')
+    parser.add_argument('--rows', type=int, default=20000, help='Number of rows of the synthetic corpus (default: 20000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of runs of which the best is reported (default: 3)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic corpus (default: 0)')
+    parser.add_argument('--batch-repeat', type=int, default=25, help='Number of times the examples are repeated in the batch benchmarks (default: 25)')
+    parser.add_argument('--json', help='Write the results as JSON to this file, to track them between releases')
+    options = parser.parse_args()
+
+    benchmark = run(options.rows, options.repeat, options.seed, options.batch_repeat)
+    printResults(benchmark)
+    if options.json:
+        with open(options.json, 'w') as f:
+            json.dump(benchmark, f, indent=2)
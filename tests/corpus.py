@@ -0,0 +1,175 @@
+import csv
+import os
+import random
+import sys
+if 'tests' in os.getcwd():
+    sys.path.append('../src')
+    examplesFile = "examples.csv"
+else:
+    sys.path.append('./src')
+    examplesFile = "tests/examples.csv"
+
+from sariDateParser.lib import CompiledPatterns, Tokenizer, constants
+
+def readExamples():
+    """
+    Returns the input date strings of the examples
+    """
+    with open(examplesFile, 'r') as f:
+        return [row['input'] for row in csv.DictReader(f)]
+
+def generateCorpus(examples, rows, seed=0):
+    """
+    Yields synthetic date strings with the shapes of the examples. Digits are replaced by random digits and month
+    terms by random month terms, so that the corpus is reproducible for a given seed.
+
+    >>> corpus = list(generateCorpus(["[10 Mai 1985]", "ca. 19. Jh."], 3, seed=1))
+    >>> corpus
+    ['[29 Décembre 1417]', 'ca. 77. Jh.', '[63 Mai 7066]']
+    """
+    generator = random.Random(seed)
+    monthTerms = CompiledPatterns.LANGUAGEMONTHTERMS
+
+    def replace(match):
+        if match.lastgroup == Tokenizer.DIGITS:
+            return ''.join(generator.choice('0123456789') for _ in match.group())
+        if match.lastgroup == Tokenizer.MONTH:
+            return generator.choice(monthTerms)
+        return match.group()
+
+    for i in range(rows):
+        yield CompiledPatterns.TOKEN.sub(replace, examples[i % len(examples)])
+
+def fuzzCorpus(examples, rows, seed=0):
+    """
+    Yields date strings that are mutations of the examples: characters of the examples are inserted, characters are
+    deleted, parts are repeated or cut off, and examples are joined, one to three times for each date string. The
+    corpus is reproducible for a given seed.
+
+    >>> corpus = list(fuzzCorpus(["[10 Mai 1985]", "ca. 19. Jh."], 3, seed=1))
+    >>> len(corpus), all(isinstance(dateString, str) for dateString in corpus)
+    (3, True)
+    >>> corpus == list(fuzzCorpus(["[10 Mai 1985]", "ca. 19. Jh."], 3, seed=1))
+    True
+    """
+    generator = random.Random(seed)
+    characters = sorted(set(''.join(examples)))
+
+    def mutate(dateString):
+        i = generator.randrange(len(dateString) + 1)
+        j = generator.randrange(i, len(dateString) + 1)
+        mutation = generator.randrange(5)
+        if mutation == 0:
+            return dateString[:i] + generator.choice(characters) + dateString[i:]
+        if mutation == 1:
+            return dateString[:i] + dateString[i + 1:]
+        if mutation == 2:
+            return dateString[:j] + dateString[i:j] + dateString[j:]
+        if mutation == 3:
+            return dateString[:i] if generator.random() < 0.5 else dateString[i:]
+        return dateString + generator.choice([' ', '-', ' - ', '/', ' und ']) + generator.choice(examples)
+
+    for i in range(rows):
+        dateString = examples[i % len(examples)]
+        for _ in range(generator.randint(1, 3)):
+            dateString = mutate(dateString)
+        yield dateString
+
+def terms():
+    """
+    Returns the terms of the term tables in constants by kind, with the words of the test patterns as connectors
+    """
+    import re
+
+    return {
+        'months': constants.ALLMONTHTERMS,
+        'centuries': constants.ALLCENTURYTERMS,
+        'halves': constants.ALLMIDTERMS,
+        'cardinals': constants.ALLCARDINALTERMS,
+        'qualifiers': [re.sub(r'\\(.)', r'\1', qualifier) for qualifier in constants.UNCERTAINTYQUALIFIERS.split('|')],
+        'connectors': ['zwischen', 'und', 'ud', 'bis', 'vor', 'nach', 'nicht vor', 'nicht nach', 'den', 'le', 'Anno', 'i.e.']
+    }
+
+# Separators between the parts of date strings
+SEPARATORS = [' ', '. ', '.', '-', ' - ', '/', ', ', '  ']
+
+def realisticCorpus(rows, seed=0):
+    """
+    Yields date strings in the common forms of the examples, made of random digits and terms of the term tables in
+    constants, so that the corpus is reproducible for a given seed
+
+    >>> list(realisticCorpus(3, seed=2))
+    ['ca. 1173', 'nach 1631', '7./20. Jahrhundert']
+    """
+    generator = random.Random(seed)
+    tables = terms()
+
+    def year():
+        return str(generator.randint(1000, 2099))
+
+    def pick(kind):
+        return generator.choice(tables[kind])
+
+    forms = [
+        lambda: year(),
+        lambda: '%s %s' % (pick('qualifiers'), year()),
+        lambda: '%d. %s %s' % (generator.randint(1, 31), pick('months'), year()),
+        lambda: '%d %s %s' % (generator.randint(1, 31), pick('months'), year()),
+        lambda: '%s %s' % (pick('months'), year()),
+        lambda: '%d.%d.%s' % (generator.randint(1, 31), generator.randint(1, 12), year()),
+        lambda: '%d. %s' % (generator.randint(1, 20), pick('centuries')),
+        lambda: '%s %s %d. %s' % (pick('cardinals'), pick('halves'), generator.randint(1, 20), pick('centuries')),
+        lambda: '%d./%d. %s' % (generator.randint(1, 19), generator.randint(1, 20), pick('centuries')),
+        lambda: 'zwischen %s und %s' % (year(), year()),
+        lambda: '%s-%s' % (year(), year()),
+        lambda: '%s %s' % (generator.choice(['vor', 'nach', 'nicht vor', 'nicht nach']), year()),
+        lambda: '%s-?' % year(),
+        lambda: '[%s]' % year(),
+        lambda: year()[:2] + '--',
+        lambda: year()[:3] + '-'
+    ]
+    for _ in range(rows):
+        yield generator.choice(forms)()
+
+# Kinds of parts that adversarial date strings repeat
+ADVERSARIALFAMILIES = ['months', 'centuries', 'halves', 'cardinals', 'qualifiers', 'connectors', 'digits', 'separators', 'mixed', 'words']
+
+def adversarial(family, length, generator):
+    """
+    Returns a date string of about the given length that repeats parts of a family, terms of a kind or digits with
+    separators, followed by a character that no pattern expects and a realistic date string. Such strings make
+    patterns that search in every position go on until the end of the string before they fail. Words are terms
+    of one kind separated by spaces only, so that the whole string is one run of letters and spaces.
+
+    >>> len(adversarial('cardinals', 100, random.Random(0))) >= 100
+    True
+    """
+    tables = terms()
+    words = generator.choice(['cardinals', 'halves', 'centuries', 'months']) if family == 'words' else None
+    parts = []
+    size = 0
+    while size < length:
+        kind = generator.choice(list(tables)) if family == 'mixed' else words or family
+        if kind == 'digits':
+            part = ''.join(generator.choice('0123456789') for _ in range(generator.randint(1, 4)))
+        elif kind == 'separators':
+            part = generator.choice(SEPARATORS) * generator.randint(1, 8)
+        else:
+            part = generator.choice(tables[kind])
+        part += ' ' if words else generator.choice(SEPARATORS)
+        parts.append(part)
+        size += len(part)
+    return ''.join(parts) + generator.choice([';', 'x', '#', '']) + next(realisticCorpus(1, generator.random()))
+
+def adversarialCorpus(rows, seed=0, length=constants.MAXLENGTH):
+    """
+    Yields adversarial date strings of up to the given length of all families in turn, so that the corpus is
+    reproducible for a given seed
+    """
+    generator = random.Random(seed)
+    for i in range(rows):
+        yield adversarial(ADVERSARIALFAMILIES[i % len(ADVERSARIALFAMILIES)], generator.randint(1, length - 40), generator)
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
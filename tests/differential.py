@@ -0,0 +1,167 @@
+"""
+Compares the results and the throughput of two parser engines over the examples, a synthetic corpus with their
+shapes and a fuzzed corpus of mutated examples
+
+An engine is a source tree of the package, given as a git revision or a directory that contains sariDateParser,
+together with the function of sariDateParser.dateParser that parses the corpus. Each engine runs in a process of its
+own, so that two versions of the package can be compared. Every differing result is reported, and the exit status
+is 1 if any result differs or the candidate is slower than the reference by more than --max-slowdown.
+
+    python tests/differential.py --reference HEAD
+    python tests/differential.py --reference v0.9.0 --candidate-call parseMany --diffs diffs.jsonl
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+srcDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# Functions that parse a list of date strings with an engine, by the name of the function of dateParser they use
+CALLS = {
+    'parse': lambda dateParser, dateStrings: [result(dateParser.parse, dateString) for dateString in dateStrings],
+    'parseMany': lambda dateParser, dateStrings: dateParser.parseMany(dateStrings),
+    'parseStream': lambda dateParser, dateStrings: [edtf for _, edtf in dateParser.parseStream(dateStrings)]
+}
+
+def result(parse, dateString):
+    """
+    Returns the result of parsing a date string, or the name of the exception it raised
+    """
+    try:
+        return parse(dateString)
+    except Exception as e:
+        return 'exception: ' + type(e).__name__
+
+def work(source, call, repeat):
+    """
+    Parses the date strings of a JSON list on stdin with the package in source and writes the results and the best
+    time of repeat runs as JSON to stdout
+    """
+    sys.path.insert(0, source)
+    import sariDateParser.dateParser as dateParser
+    dateStrings = json.load(sys.stdin)
+    parse = CALLS[call]
+    # Patterns are compiled on first use, which is not part of the throughput
+    parse(dateParser, dateStrings[:100])
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            results = parse(dateParser, dateStrings)
+        except Exception as e:
+            # A batch call fails as a whole, each date string is then parsed on its own to find the ones that fail
+            results = [result(lambda dateString: parse(dateParser, [dateString])[0], dateString) for dateString in dateStrings]
+            sys.stderr.write("%s raised %s, results are those of each date string on its own\n" % (call, type(e).__name__))
+            best = None
+            break
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    json.dump({'results': results, 'seconds': best, 'source': dateParser.__file__}, sys.stdout)
+
+def checkout(revision, directory):
+    """
+    Extracts the source tree of a git revision into a directory and returns the path of its src directory
+    """
+    root = subprocess.run(['git', 'rev-parse', '--show-toplevel'], cwd=srcDir, check=True, capture_output=True, text=True).stdout.strip()
+    archive = subprocess.run(['git', 'archive', '--format=tar', revision, 'src'], cwd=root, check=True, capture_output=True).stdout
+    os.makedirs(directory)
+    subprocess.run(['tar', '-x', '-C', directory], input=archive, check=True)
+    return os.path.join(directory, 'src')
+
+def source(engine, directory):
+    """
+    Returns the src directory of an engine given as a directory or a git revision
+    """
+    if os.path.isdir(os.path.join(engine, 'sariDateParser')):
+        return os.path.abspath(engine)
+    if os.path.isdir(os.path.join(engine, 'src', 'sariDateParser')):
+        return os.path.abspath(os.path.join(engine, 'src'))
+    return checkout(engine, directory)
+
+def runEngine(source, call, dateStrings, repeat):
+    """
+    Runs an engine in a new process and returns its results and the best time to parse all date strings
+    """
+    process = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', source, call, str(repeat)], input=json.dumps(dateStrings), capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError("Engine %s failed:\n%s" % (source, process.stderr))
+    sys.stderr.write(process.stderr)
+    return json.loads(process.stdout)
+
+def corpora(rows, fuzzed, seed):
+    """
+    Returns the date strings of the examples, of the synthetic corpus and of the fuzzed corpus, with the name of the
+    corpus of each
+    """
+    from corpus import fuzzCorpus, generateCorpus, readExamples
+
+    examples = readExamples()
+    named = [('examples', examples), ('generated', list(generateCorpus(examples, rows, seed))), ('fuzzed', list(fuzzCorpus(examples, fuzzed, seed)))]
+    return [dateString for name, dateStrings in named for dateString in dateStrings], [name for name, dateStrings in named for dateString in dateStrings]
+
+def compare(reference, candidate, dateStrings, names):
+    """
+    Returns the differing results as dictionaries with the date string, its corpus and both results
+
+    >>> compare({'results': ['1900?', None]}, {'results': ['1900?', '1900']}, ['um 1900', 'o.J. 1900'], ['examples', 'fuzzed'])
+    [{'dateString': 'o.J. 1900', 'corpus': 'fuzzed', 'reference': None, 'candidate': '1900'}]
+    """
+    return [
+        {'dateString': dateString, 'corpus': name, 'reference': expected, 'candidate': actual}
+        for dateString, name, expected, actual in zip(dateStrings, names, reference['results'], candidate['results'])
+        if expected != actual
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the results and throughput of a candidate parser engine with a reference engine')
+    parser.add_argument('--reference', default='HEAD', help='Git revision or directory of the reference engine (default: HEAD)')
+    parser.add_argument('--candidate', default=srcDir, help='Git revision or directory of the candidate engine (default: the working tree)')
+    parser.add_argument('--reference-call', choices=sorted(CALLS), default='parse', help='Function that parses with the reference engine (default: parse)')
+    parser.add_argument('--candidate-call', choices=sorted(CALLS), default='parse', help='Function that parses with the candidate engine (default: parse)')
+    parser.add_argument('--rows', type=int, default=100000, help='Number of rows of the synthetic corpus (default: 100000)')
+    parser.add_argument('--fuzzed', type=int, default=100000, help='Number of rows of the fuzzed corpus (default: 100000)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic and fuzzed corpora (default: 0)')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of runs of which the best time is reported (default: 3)')
+    parser.add_argument('--max-slowdown', type=float, default=None, help='Fail if the candidate takes more than this factor of the time of the reference, such as 1.05')
+    parser.add_argument('--show', type=int, default=20, help='Number of differences printed (default: 20)')
+    parser.add_argument('--diffs', help='Write all differences as JSONL to this file')
+    options = parser.parse_args()
+
+    dateStrings, names = corpora(options.rows, options.fuzzed, options.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        engines = []
+        for engine, call, name in [(options.reference, options.reference_call, 'reference'), (options.candidate, options.candidate_call, 'candidate')]:
+            engineSource = source(engine, os.path.join(directory, name))
+            engines.append(runEngine(engineSource, call, dateStrings, options.repeat))
+            print("%-10s %s %s" % (name, engine, call))
+    reference, candidate = engines
+
+    diffs = compare(reference, candidate, dateStrings, names)
+    for name in dict.fromkeys(names):
+        print("%-10s %7d date strings, %6d differences" % (name, names.count(name), sum(1 for diff in diffs if diff['corpus'] == name)))
+    for diff in diffs[:options.show]:
+        print("  %-10s %r: %r -> %r" % (diff['corpus'], diff['dateString'], diff['reference'], diff['candidate']))
+    if options.diffs:
+        with open(options.diffs, 'w', encoding='utf-8') as f:
+            for diff in diffs:
+                f.write(json.dumps(diff, ensure_ascii=False) + '\n')
+
+    failed = bool(diffs)
+    if reference['seconds'] and candidate['seconds']:
+        ratio = reference['seconds'] / candidate['seconds']
+        print("throughput reference %d items/s, candidate %d items/s, ratio %.2f" % (len(dateStrings) / reference['seconds'], len(dateStrings) / candidate['seconds'], ratio))
+        if options.max_slowdown is not None and candidate['seconds'] > reference['seconds'] * options.max_slowdown:
+            print("candidate is slower than the reference by more than a factor of %.2f" % options.max_slowdown)
+            failed = True
+    print("Completed with %d out of %d results differing" % (len(diffs), len(dateStrings)))
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--worker']:
+        work(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+    else:
+        main()
@@ -13,7 +13,8 @@ echo "Running tests..."
 getopts v flag
 
 echo "Running tests in source code"
-for f in $(find $srcdir -type f -name '*.py' -follow -print)
+# serve.py, cli.py and shapes.py run their command when run, their tests are in testServe.py, testCli.py and testShapes.py
+for f in $(find $srcdir -type f -name '*.py' -not -name 'serve.py' -not -name 'cli.py' -not -name 'shapes.py' -follow -print)
 do
     python3 $f -$flag
 done
@@ -24,6 +25,11 @@ if [[ $REPLY =~ ^[Yy]$ ]]
 then
   echo "Running test cases"
   python3 $testsdir/testExamples.py
+  python3 $testsdir/testImportTime.py
+  python3 $testsdir/testRuleVersions.py
+  python3 $testsdir/testServe.py
+  python3 $testsdir/testCli.py
+  python3 $testsdir/testShapes.py
 fi
 
 echo "All tests completed!"
\ No newline at end of file
@@ -0,0 +1,74 @@
+import doctest
+import json
+import os
+import subprocess
+import sys
+import tempfile
+srcDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, srcDir)
+
+import sariDateParser.cli as cli
+from sariDateParser.dateParser import defaultParser
+
+# JSONL records, with years given as numbers, missing values, dates that are not parsed and invalid dates, which are
+# written with a lower precision whether failures are reported or not
+RECORDS = [{'date': 1900}, {'date': 0}, {'date': "um 1900"}, {'date': None}, {}, {'date': "o.J."}, {'date': "30 Feb 1861"}, {'date': "31.31.1850"}]
+EXPECTED = ['1900', None, '1900?', None, None, None, '1861-02', '1850']
+# Values written to the failures file, with the detail of each
+EXPECTEDFAILURES = [(0, '_'), (None, ''), (None, ''), ("o.J.", "o.J."), ("30 Feb 1861", '1861-02-30'), ("31.31.1850", '1850-31-31')]
+# Prewarm file of French dates, whose languages are used when none are given: "Juni" is then not a month
+PREWARM = {'languages': ['fr'], 'shapes': [{'pattern': '_ 🌕 ____', 'example': "2 Juin 1890"}]}
+PREWARMRECORDS = [{'date': "2 Juin 1890"}, {'date': "2 Juni 1890"}]
+PREWARMEXPECTED = ['1890-06-02', '1890']
+# Inputs that are reported as errors, with their format and the message expected
+MALFORMED = [('', 'csv', "-: The input has no header row"),
+             ('{"date": 1900}\n[1, 2]\n', 'jsonl', "-: Line 2 is not a JSON object"),
+             ('{"date": 1900}\n\n{"date":\n', 'jsonl', "-: Line 3 is not valid JSON")]
+
+def runCli(arguments, records=RECORDS):
+    """
+    Runs python -m sariDateParser.cli on the records with the arguments and returns the EDTF dates it writes
+    """
+    process = subprocess.run([sys.executable, '-m', 'sariDateParser.cli', '-', '--format', 'jsonl', '--column', 'date'] + arguments,
+                             input=''.join(json.dumps(record) + '\n' for record in records), capture_output=True, text=True,
+                             check=True, env=dict(os.environ, PYTHONPATH=srcDir))
+    return [json.loads(line)['edtf'] for line in process.stdout.splitlines()]
+
+countErrors = doctest.testmod(cli).failed
+
+for arguments in [[], ['--workers', '2', '--chunk-size', '2']]:
+    results = runCli(arguments)
+    if results != EXPECTED:
+        countErrors += 1
+        sys.stderr.write("cli %s returned %s, expected %s\n" % (' '.join(arguments), results, EXPECTED))
+
+with tempfile.TemporaryDirectory() as directory:
+    failuresFile = os.path.join(directory, 'failures.jsonl')
+    results = runCli(['--failures', failuresFile, '--workers', '2', '--chunk-size', '3'])
+    with open(failuresFile, encoding='utf-8') as f:
+        failures = [json.loads(line) for line in f]
+    if results != EXPECTED or [(failure['value'], failure['detail']) for failure in failures] != EXPECTEDFAILURES:
+        countErrors += 1
+        sys.stderr.write("cli --failures returned %s and wrote %s\n" % (results, failures))
+
+    prewarmFile = os.path.join(directory, 'prewarm.json')
+    with open(prewarmFile, 'w', encoding='utf-8') as f:
+        json.dump(PREWARM, f, ensure_ascii=False)
+    languages = cli.initWorker(None, prewarmFile)
+    if languages != ['fr'] or defaultParser(languages).cacheInfo()['results'].currsize != 1:
+        countErrors += 1
+        sys.stderr.write("initWorker did not prewarm the caches of the languages of the prewarm file\n")
+    for arguments in [[], ['--workers', '2', '--chunk-size', '1'], ['--failures', failuresFile, '--workers', '2']]:
+        results = runCli(['--prewarm', prewarmFile] + arguments, PREWARMRECORDS)
+        if results != PREWARMEXPECTED:
+            countErrors += 1
+            sys.stderr.write("cli --prewarm %s returned %s, expected %s\n" % (' '.join(arguments), results, PREWARMEXPECTED))
+
+for content, fileFormat, message in MALFORMED:
+    process = subprocess.run([sys.executable, '-m', 'sariDateParser.cli', '-', '--format', fileFormat, '--column', 'date'],
+                             input=content, capture_output=True, text=True, env=dict(os.environ, PYTHONPATH=srcDir))
+    if process.returncode != 2 or not process.stderr.rstrip().endswith(message):
+        countErrors += 1
+        sys.stderr.write("cli on %r exited with %d and wrote %s, expected %s\n" % (content, process.returncode, process.stderr, message))
+
+print("Completed with %d CLI checks failed" % countErrors)
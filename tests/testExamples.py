@@ -9,7 +9,7 @@ else:
     sys.path.append('./src')
     examplesFile = "tests/examples.csv"
 
-from sariDateParser.dateParser import parse
+from sariDateParser.dateParser import parse, parseMany
 
 examples = []
 
@@ -26,4 +26,12 @@ for i, example in enumerate(examples):
         countErrors +=1
         sys.stderr.write("%d: %s is %s instead of %s\n" % (i, example['input'], str(parse(example['input'])), example['output']))
 
-print("Completed with %d out of %d tests failed" % (countErrors, len(examples)))
\ No newline at end of file
+print("Completed with %d out of %d tests failed" % (countErrors, len(examples)))
+
+countBatchDifferences = 0
+for i, (example, result) in enumerate(zip(examples, parseMany(example['input'] for example in examples))):
+    if result != parse(example['input']):
+        countBatchDifferences += 1
+        sys.stderr.write("%d: %s is %s in batch instead of %s\n" % (i, example['input'], str(result), str(parse(example['input']))))
+
+print("Completed with %d out of %d batch results differing from parse" % (countBatchDifferences, len(examples)))
\ No newline at end of file
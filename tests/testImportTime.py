@@ -0,0 +1,43 @@
+import ast
+import os
+import subprocess
+import sys
+srcDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# Modules whose import is checked, with the standard modules they must not load. None of them should build or
+# compile any pattern on import. Their import time is reported, but depends too much on the machine and on the state
+# of its file cache to be checked.
+MODULES = {
+    'sariDateParser.dateParser': ['re'],
+    'sariDateParser.cli': []
+}
+
+def importModule(module):
+    """
+    Imports a module in a new interpreter and returns its cumulative import time in milliseconds, as reported by
+    python -X importtime, whether the patterns have been built by then and the names of the modules loaded
+    """
+    code = "import sys, %s; print(repr(('DISPATCH' in vars(sys.modules['sariDateParser.lib.CompiledPatterns']), sorted(sys.modules))))" % module
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True, check=True, env=dict(os.environ, PYTHONPATH=srcDir))
+    cumulative = None
+    for line in process.stderr.splitlines():
+        if line.startswith('import time:') and line.split('|')[-1].strip() == module:
+            cumulative = int(line.split('|')[1]) / 1000
+    built, loaded = ast.literal_eval(process.stdout.strip())
+    return cumulative, built, loaded
+
+countErrors = 0
+for module, unwanted in MODULES.items():
+    results = [importModule(module) for _ in range(3)]
+    milliseconds = min(result[0] for result in results)
+    _, built, loaded = results[0]
+    print("Import of %s took %.1f ms" % (module, milliseconds))
+    if built:
+        countErrors += 1
+        sys.stderr.write("%s builds the patterns on import\n" % module)
+    for name in unwanted:
+        if name in loaded:
+            countErrors += 1
+            sys.stderr.write("%s loads %s on import\n" % (module, name))
+
+print("Completed with %d import time checks failed" % countErrors)
@@ -0,0 +1,40 @@
+import json
+import os
+import subprocess
+import sys
+srcDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# Results are stored with the version of their rule, which must be the same in every process and must not change
+# while parsing, or a ResultStore parses unchanged values again
+CODE = """
+import json
+from sariDateParser.dateParser import DateParser
+parser = DateParser()
+before = parser.ruleVersions()
+parser.parseMany(["Aug 95", "2 Feb 20", "10.4.1983", "um 1900", "19. Jh."])
+print(json.dumps({'before': before, 'after': parser.ruleVersions()}))
+"""
+
+def ruleVersions(hashSeed):
+    """
+    Returns the rule versions of a new parser and after parsing some date strings, computed in a new interpreter
+    with the given hash seed
+    """
+    process = subprocess.run([sys.executable, '-c', CODE], capture_output=True, text=True, check=True, env=dict(os.environ, PYTHONPATH=srcDir, PYTHONHASHSEED=str(hashSeed)))
+    versions = json.loads(process.stdout)
+    return versions['before'], versions['after']
+
+countErrors = 0
+first, parsed = ruleVersions(1)
+for rule in sorted(first):
+    if parsed[rule] != first[rule]:
+        countErrors += 1
+        sys.stderr.write("Version of %s changed after parsing\n" % rule)
+for hashSeed in [2, 3]:
+    other, _ = ruleVersions(hashSeed)
+    for rule in sorted(first):
+        if other[rule] != first[rule]:
+            countErrors += 1
+            sys.stderr.write("Version of %s differs with PYTHONHASHSEED=%d\n" % (rule, hashSeed))
+
+print("Completed with %d rule version checks failed" % countErrors)
@@ -0,0 +1,64 @@
+import doctest
+import http.client
+import json
+import os
+import subprocess
+import sys
+srcDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, srcDir)
+
+import sariDateParser.serve as serve
+from sariDateParser import dateParser
+from sariDateParser.lib import CompiledPatterns, constants
+
+# Requests sent to a server on localhost, with the expected status and response
+CASES = [
+    ('POST', '/parse', ["um 1900", "19. Jh.", None, "o.J."], 200, {'results': ['1900?', '18XX', None, None]}),
+    ('POST', '/parse', {'dates': ["2 Juin 1890"], 'languages': ['fr']}, 200, {'results': ['1890-06-02']}),
+    ('POST', '/parse', {'dates': ["2 Juin 1890"], 'languages': ['xx']}, 400, None),
+    ('POST', '/parse', {'dates': ["2 Juin 1890"], 'languages': ['fr', 'fr', 'fr']}, 200, {'results': ['1890-06-02']}),
+    ('POST', '/parse', {'dates': ["2 Juin 1890"], 'languages': []}, 400, None),
+    ('POST', '/parse', ["1751"] * 5, 413, None),
+    ('POST', '/parse', "um 1900", 400, None),
+    ('GET', '/parse', None, 405, None),
+    ('GET', '/health', None, 200, {'status': 'ok'}),
+    ('GET', '/missing', None, 404, None)
+]
+
+countErrors = doctest.testmod(serve).failed
+
+# Parsers and patterns are only kept for a bounded number of combinations of languages, whatever clients send
+constants.MAXLANGUAGECOMBINATIONS = 2
+for languages in [['de'], ['en'], ['fr']]:
+    dateParser.defaultParser(languages)
+if set(dateParser.parsers) - {None} != {('en',), ('fr',)} or set(CompiledPatterns._compiled) != {('de', 'en', 'fr'), ('en',), ('fr',)}:
+    countErrors += 1
+    sys.stderr.write("Kept parsers %s and patterns %s for more than 2 combinations of languages\n" % (list(dateParser.parsers), list(CompiledPatterns._compiled)))
+
+process = subprocess.Popen([sys.executable, '-m', 'sariDateParser.serve', '--port', '0', '--workers', '2', '--max-batch', '4', '--chunk-size', '1'],
+                           stderr=subprocess.PIPE, text=True, env=dict(os.environ, PYTHONPATH=srcDir))
+try:
+    line = process.stderr.readline()
+    if not line.startswith("Serving on http://"):
+        raise RuntimeError("Server did not start: %s%s" % (line, process.stderr.read()))
+    host, port = line.strip()[len("Serving on http://"):].rsplit(':', 1)
+    connection = http.client.HTTPConnection(host, int(port), timeout=30)
+    for method, path, body, expectedStatus, expectedResponse in CASES:
+        connection.request(method, path, body=json.dumps(body) if body is not None else None)
+        response = connection.getresponse()
+        content = json.loads(response.read())
+        if response.status != expectedStatus or (expectedResponse is not None and content != expectedResponse):
+            countErrors += 1
+            sys.stderr.write("%s %s returned %d %s, expected %d %s\n" % (method, path, response.status, content, expectedStatus, expectedResponse))
+
+    connection.request('GET', '/stats')
+    stats = json.loads(connection.getresponse().read())
+    if stats['dates'] != 6 or stats['errors'] != 6 or stats['latency']['count'] != 3:
+        countErrors += 1
+        sys.stderr.write("Unexpected stats %s\n" % stats)
+    connection.close()
+finally:
+    process.terminate()
+    process.wait()
+
+print("Completed with %d server checks failed" % countErrors)
@@ -0,0 +1,39 @@
+import doctest
+import json
+import os
+import subprocess
+import sys
+import tempfile
+srcDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, srcDir)
+
+import sariDateParser.shapes as shapes
+
+# Date strings of the input file, with the first line of the report and the prewarm file expected
+DATESTRINGS = ["um 1900", "um 1850", "19. Jh.", "um 1900", "o.J."]
+EXPECTEDSUMMARY = "5 dates in 3 shapes, 1 not parsed"
+EXPECTEDPREWARM = {'languages': ['de'], 'shapes': [
+    {'pattern': 'um ____', 'example': "um 1900", 'count': 3, 'rule': 'singleYearWithQualifier'},
+    {'pattern': '__. ¢.', 'example': "19. Jh.", 'count': 1, 'rule': 'century'}
+]}
+
+countErrors = doctest.testmod(shapes).failed
+
+with tempfile.TemporaryDirectory() as directory:
+    inputFile = os.path.join(directory, 'dates.txt')
+    prewarmFile = os.path.join(directory, 'prewarm.json')
+    with open(inputFile, 'w', encoding='utf-8') as f:
+        f.write(''.join(dateString + '\n' for dateString in DATESTRINGS))
+    process = subprocess.run([sys.executable, '-m', 'sariDateParser.shapes', inputFile, '--languages', 'de', '--prewarm', prewarmFile, '--prewarm-shapes', '2'],
+                             capture_output=True, text=True, check=True, env=dict(os.environ, PYTHONPATH=srcDir))
+    lines = process.stdout.splitlines()
+    if not lines or lines[0] != EXPECTEDSUMMARY or len(lines) != 5:
+        countErrors += 1
+        sys.stderr.write("sari-date-shapes printed %s, expected %s and a report of 3 shapes\n" % (process.stdout, EXPECTEDSUMMARY))
+    with open(prewarmFile, encoding='utf-8') as f:
+        prewarmed = json.load(f)
+    if prewarmed != EXPECTEDPREWARM:
+        countErrors += 1
+        sys.stderr.write("sari-date-shapes wrote %s, expected %s\n" % (prewarmed, EXPECTEDPREWARM))
+
+print("Completed with %d shape report checks failed" % countErrors)
@@ -0,0 +1,119 @@
+"""
+Reports the worst-case latency of each rule over realistic and adversarial date strings generated from the term
+tables, and how the time to parse adversarial date strings of each family grows with their length
+
+    python tests/worstCase.py --rows 20000 --budget-ms 2
+"""
+import argparse
+import math
+import random
+import sys
+from time import perf_counter
+
+from corpus import ADVERSARIALFAMILIES, adversarial, adversarialCorpus, realisticCorpus
+
+from sariDateParser.dateParser import PARSERS, DateParser, cleanDateString
+from sariDateParser.lib import CompiledPatterns, Tokenizer, constants
+from sariDateParser.lib.Instrumentation import Histogram
+
+class Latencies:
+    """
+    Histogram of the durations of a stage, with the slowest date string
+    """
+
+    def __init__(self):
+        self.histogram = Histogram()
+        self.worst = 0.0
+        self.worstDateString = None
+
+    def add(self, seconds, dateString):
+        self.histogram.add(seconds)
+        if seconds > self.worst:
+            self.worst = seconds
+            self.worstDateString = dateString
+
+def timed(function, *arguments, repeat=3):
+    """
+    Returns the result of a call and its best time of repeat calls, which leaves out pauses of the interpreter
+    """
+    best = None
+    for _ in range(repeat):
+        start = perf_counter()
+        result = function(*arguments)
+        seconds = perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return result, best
+
+def ruleLatencies(dateStrings, parser):
+    """
+    Times extracting the pattern of each date string, the test of every rule on it, the parser of the rule that
+    matches and parsing as a whole, and returns the latencies of each stage
+    """
+    patterns = CompiledPatterns.forLanguages(parser.languages)
+    stages = {}
+
+    def record(stage, seconds, dateString):
+        stages.setdefault(stage, Latencies()).add(seconds, dateString)
+
+    for dateString in dateStrings:
+        tokens, seconds = timed(Tokenizer.tokenize, dateString, patterns)
+        record('extractPattern', seconds, dateString)
+        pattern = Tokenizer.toPattern(tokens)
+        matched = None
+        for rule in parser.rules:
+            match, seconds = timed(patterns.TESTS[rule].search, pattern)
+            record('test ' + rule, seconds, dateString)
+            if match is not None and matched is None:
+                matched = rule
+        if matched is not None:
+            _, seconds = timed(PARSERS[matched], cleanDateString(dateString), tokens, False, patterns, parser.defaultCentury)
+            record('parser ' + matched, seconds, dateString)
+        _, seconds = timed(parser.parse, dateString)
+        record('parse', seconds, dateString)
+    return stages
+
+def growth(family, lengths, samples, seed):
+    """
+    Returns the worst time to parse adversarial date strings of a family at each length, without a length limit, and
+    the exponent of its growth between the shortest and the longest, which is about 1 if it grows linearly
+    """
+    parser = DateParser(maxLength=None)
+    generator = random.Random(seed)
+    worst = []
+    for length in lengths:
+        dateStrings = [adversarial(family, length, generator) for _ in range(samples)]
+        worst.append(max(timed(parser.parse, dateString)[1] for dateString in dateStrings))
+    return worst, math.log(worst[-1] / worst[0]) / math.log(lengths[-1] / lengths[0])
+
+def main():
+    parser = argparse.ArgumentParser(description='Report the worst-case latency of each rule over realistic and adversarial date strings')
+    parser.add_argument('--rows', type=int, default=10000, help='Number of realistic and of adversarial date strings (default: 10000)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the generated date strings (default: 0)')
+    parser.add_argument('--length', type=int, default=8 * constants.MAXLENGTH, help='Longest adversarial date string of the growth report (default: %d)' % (8 * constants.MAXLENGTH))
+    parser.add_argument('--samples', type=int, default=5, help='Number of date strings of each family and length in the growth report (default: 5)')
+    parser.add_argument('--budget-ms', type=float, help='Fail if parsing any date string takes longer than this')
+    options = parser.parse_args()
+
+    dateParser = DateParser()
+    dateStrings = list(realisticCorpus(options.rows, options.seed)) + list(adversarialCorpus(options.rows, options.seed))
+    print("Latency over %d realistic and %d adversarial date strings of up to %d characters" % (options.rows, options.rows, dateParser.maxLength))
+    print("%-50s %8s %8s %10s  %s" % ('stage', 'count', 'p99 µs', 'worst µs', 'slowest date string'))
+    stages = ruleLatencies(dateStrings, dateParser)
+    for stage, latencies in sorted(stages.items(), key=lambda item: -item[1].worst):
+        print("%-50s %8d %8d %10.1f  %r" % (stage, latencies.histogram.count, latencies.histogram.percentile(99), latencies.worst * 1e6, latencies.worstDateString[:60]))
+
+    lengths = [options.length // 8, options.length // 4, options.length // 2, options.length]
+    print("\nWorst time to parse adversarial date strings without a length limit, in µs")
+    print("%-12s %s %9s" % ('family', ' '.join('%9d' % length for length in lengths), 'exponent'))
+    for family in ADVERSARIALFAMILIES:
+        worst, exponent = growth(family, lengths, options.samples, options.seed)
+        print("%-12s %s %9.2f" % (family, ' '.join('%9.1f' % (seconds * 1e6) for seconds in worst), exponent))
+
+    worst = stages['parse'].worst * 1e3
+    print("\nWorst parse %.3f ms for %r" % (worst, stages['parse'].worstDateString[:60]))
+    if options.budget_ms is not None and worst > options.budget_ms:
+        print("Parsing takes longer than the budget of %.3f ms" % options.budget_ms)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()